@@ -15,36 +15,71 @@
 # limitations under the License.
 
 
-import inspect
-import sys
-
-from qsteed.backends import *
-from qsteed.compiler import *
-from qsteed.config import *
-from qsteed.dag import *
-from qsteed.graph import *
-from qsteed.parallelmanager import *
-from qsteed.passes import *
-from qsteed.passflow import *
-from qsteed.resourcemanager import *
-from qsteed.results import *
-from qsteed.taskmanager import *
-from qsteed.taskscheduler import *
-from qsteed.transpiler import *
-from qsteed.utils import *
+import importlib
+
 from qsteed.version import __version__
 
-current_module = sys.modules[__name__]
+# Public names and the subpackage providing each of them. Subpackages are imported lazily (PEP 562)
+# on first attribute access, so ``import qsteed`` does not pay for quafu, networkx, scipy, etc.
+_LAZY_MEMBERS = {
+    "Backend": "qsteed.backends",
+    "ChipInfo": "qsteed.backends",
+    "StandardizedCircuit": "qsteed.compiler",
+    "get_config": "qsteed.config",
+    "DAGCircuit": "qsteed.dag",
+    "InstructionNode": "qsteed.dag",
+    "circuit_to_dag": "qsteed.dag",
+    "dag_to_circuit": "qsteed.dag",
+    "CouplingGraph": "qsteed.graph",
+    "circuit_to_graph": "qsteed.graph",
+    "draw_graph": "qsteed.graph",
+    "parallel_process_circuits": "qsteed.parallelmanager",
+    "BasePass": "qsteed.passes",
+    "DataDict": "qsteed.passes",
+    "GateCombineOptimization": "qsteed.passes",
+    "Layout": "qsteed.passes",
+    "Model": "qsteed.passes",
+    "OneQubitGateOptimization": "qsteed.passes",
+    "ParaSubstitution": "qsteed.passes",
+    "SabreLayout": "qsteed.passes",
+    "SabreLayoutParallel": "qsteed.passes",
+    "SabreRouting": "qsteed.passes",
+    "UnitaryDecompose": "qsteed.passes",
+    "UnrollTo2Qubit": "qsteed.passes",
+    "UnrollToBasis": "qsteed.passes",
+    "PassFlow": "qsteed.passflow",
+    "PresetPassflow": "qsteed.passflow",
+    "BuildLibrary": "qsteed.resourcemanager",
+    "check_database": "qsteed.resourcemanager",
+    "database_operations": "qsteed.resourcemanager",
+    "delete_db": "qsteed.resourcemanager",
+    "get_mysql_config": "qsteed.resourcemanager",
+    "plot_probabilities": "qsteed.results",
+    "Transpiler": "qsteed.transpiler",
+    "TranspilerVis": "qsteed.transpiler",
+    "RandomCircuit": "qsteed.utils",
+    "reverse_circuit": "qsteed.utils",
+}
+
+_SUBPACKAGES = {
+    "apis", "backends", "compiler", "config", "dag", "graph", "parallelmanager", "passes", "passflow",
+    "resourcemanager", "results", "taskmanager", "taskscheduler", "transpiler", "utils",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_MEMBERS:
+        value = getattr(importlib.import_module(_LAZY_MEMBERS[name]), name)
+    elif name in _SUBPACKAGES:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # Cache it, later lookups bypass __getattr__.
+    return value
 
 
-def get_qsteed_members():
-    qsteed_members = [
-        name for name in dir(current_module)
-        if (inspect.isfunction(getattr(current_module, name)) or inspect.isclass(getattr(current_module, name)))
-    ]
-    return qsteed_members
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_MEMBERS) | _SUBPACKAGES)
 
 
-__all__ = get_qsteed_members()
-__all__.append('__version__')
-__all__.sort()
+__all__ = sorted([*_LAZY_MEMBERS, '__version__'])
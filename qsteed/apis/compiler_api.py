@@ -15,7 +15,10 @@
 # limitations under the License.
 
 
+import functools
+
 from qsteed.compiler.compiler import Compiler
+from qsteed.parallelmanager.parallel_circuits import create_pool
 from qsteed.passflow.passflow import PassFlow
 
 
@@ -52,8 +55,8 @@ def call_compiler_api(circuit: str = None,
         passflow (PassFlow): Customizing the transpilation process
         task_type (str): "qc" - quantum circuit task
                          "vqa" - Variational quantum algorithm task (subsequent versions will provide)
-        repeat (int): Transpilation is repeated several times,
-                      from which the best transpilation result is selected (subsequent versions will provide).
+        repeat (int): Transpilation is repeated several times (in parallel),
+                      from which the best transpilation result (fewest swaps, then smallest depth) is selected.
         vqpu_preferred (str): "fidelity": Choose the VQPU with the highest fidelity.
                               "structure": Choose the VQPU whose qubits coupling structure best matches the task.
         task_info (dict): The above parameters can be packaged
@@ -82,3 +85,24 @@ def call_compiler_api(circuit: str = None,
     compiled_openqasm, measure_q2c, compiled_circuit_information = compiler.compile()
     compiled_info = [compiled_openqasm, measure_q2c, compiled_circuit_information]
     return compiled_info
+
+
+def call_compiler_api_batch(circuits: list, num_processes: int = None, **task_info):
+    """
+    Compile a batch of circuits in parallel, all with the same task parameters.
+
+    Args:
+        circuits (list): A list of OpenQASM 2.0 strings.
+        num_processes (int): Number of worker processes. Defaults to half of the CPU cores,
+                             and never more than the number of circuits.
+        task_info (dict): The parameters of `call_compiler_api` (except circuit), shared by all circuits.
+
+    Returns:
+        compiled_infos (list): The `call_compiler_api` result of each circuit, in the order of `circuits`.
+    """
+    task_info.pop("circuit", None)
+    # The task parameters (including any passflow) are bound once and shipped with each chunk of circuits.
+    compile_task = functools.partial(call_compiler_api, **task_info)
+    with create_pool(len(circuits), num_processes) as pool:
+        compiled_infos = pool.map(compile_task, circuits)
+    return compiled_infos
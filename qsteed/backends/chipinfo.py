@@ -15,16 +15,31 @@
 # limitations under the License.
 
 
+import ast
 import configparser
+from functools import lru_cache
 
 from qsteed.config.get_config import get_config
 
-CONFIG_FILE = get_config()
-CONFIG = configparser.ConfigParser()
-CONFIG.read(CONFIG_FILE)
+
+@lru_cache(maxsize=1)
+def _load_config():
+    """Read the configuration file once and share the parsed ConfigParser."""
+    config = configparser.ConfigParser()
+    config.read(get_config())
+    return config
+
+
+@lru_cache(maxsize=1)
+def _chip_cache():
+    """Chip dicts of the [Chips] section, parsed once and keyed by lower-case chip name."""
+    return {name: ast.literal_eval(chip) for name, chip in _load_config()['Chips'].items()}
+
+
+CONFIG = _load_config()
 
 chips = CONFIG['Chips']
-system_id_name = eval(CONFIG['Systems']['system_id_name'])
+system_id_name = ast.literal_eval(CONFIG['Systems']['system_id_name'])
 system_status = CONFIG['system_status']
 
 
@@ -40,25 +55,27 @@ class ChipInfo:
         self.all_qubits_info = None
         self.qubits_info = None
         self.basis_gates = None
+        self.basis_set = None  # frozenset of basis_gates, for membership tests
         self.priority_qubits = None
         self.chip_info_dict = chip_info_dict
         self.int_to_qubit = None
         self.qubit_to_int = None
 
     def initialize_chip(self):
-        chip = chips.get(self.name.lower())
+        chip = _chip_cache().get(self.name.lower())
 
         if chip:
-            chip = eval(chip)
             self.system_id = chip['system_id']
             self.name = chip['name']
             self.set_chip_dict()
-            if sorted(self.basis_gates) != sorted(chip['basis_gates']):
+            basis_set = frozenset(chip['basis_gates'])
+            if frozenset(self.basis_gates) != basis_set:
                 print("Warning: The gate sets given in the configuration file and the chip information "
                       "file are inconsistent. The configuration file gate set is selected by default.")
-            self.basis_gates = chip['basis_gates']
-            if 'id' not in self.basis_gates:
+            self.basis_gates = list(chip['basis_gates'])  # copy, the cached chip dict is shared
+            if 'id' not in basis_set:
                 self.basis_gates.append('id')
+            self.basis_set = basis_set | {'id'}
             self.qubit_num = chip['qubit_num']
         else:
             raise NameError(f"Could not find system name mapping for {self.name}")
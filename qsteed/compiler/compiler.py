@@ -15,40 +15,38 @@
 # limitations under the License.
 
 
-import configparser
-import operator
-import re
+import ast
+import copy
+import multiprocessing
+import random
+import sys
 import time
-from functools import reduce
 
+import dill
+import numpy as np
 from quafu import QuantumCircuit as quafuQC
 
 from qsteed.backends.backend import Backend
+from qsteed.backends.chipinfo import chips, system_id_name, system_status
 from qsteed.compiler.program_verification import check_openqasm
 from qsteed.compiler.qasm_parser import actually_bits, reset_qasm_bits, reset_real_qubits, get_measures, circuit_depth
-from qsteed.compiler.qasm_parser import qreg_creg
-from qsteed.compiler.standardized_circuit import StandardizedCircuit
-from qsteed.config.get_config import get_config
+from qsteed.compiler.qasm_parser import final_measure_mapping, is_openqasm2, parse_qasm_once
+from qsteed.compiler.standardized_circuit import cached_standardized_circuit
 from qsteed.graph.similar_substructure import similar_structure
+from qsteed.parallelmanager.parallel_circuits import create_pool
+from qsteed.passes.mapping.layout.sabre_layout import SabreLayout
 from qsteed.passes.model import Model
 from qsteed.passflow.passflow import PassFlow
+from qsteed.passflow.preset_passflow import PresetPassflow
 from qsteed.resourcemanager.database_sql.database_query import query_vqpu, query_qpu, query_specified_vqpu, \
     generate_specified_vqpu
-from qsteed.resourcemanager.database_sql.instantiating import get_qpu, get_vqpu, get_subqpu
+from qsteed.resourcemanager.database_sql.instantiating import get_qpu, get_vqpu, get_subqpu, sort_vqpus
 from qsteed.transpiler.transpiler import Transpiler
 
 QPUs = get_qpu()
 VQPUs = get_vqpu()
 SubQPUs = get_subqpu()
 
-CONFIG_FILE = get_config()
-CONFIG = configparser.ConfigParser()
-CONFIG.read(CONFIG_FILE)
-
-chips = CONFIG['Chips']
-system_id_name = eval(CONFIG['Systems']['system_id_name'])
-system_status = CONFIG['system_status']
-
 
 class Compiler:
     def __init__(self,
@@ -93,29 +91,31 @@ class Compiler:
         # Determine the type of circuit
         if isinstance(self.circuit, quafuQC):
             self.circuit = self.circuit.to_openqasm(with_para=True)
-        elif isinstance(self.circuit, str) and 'OPENQASM 2.0' in self.circuit:
+        elif is_openqasm2(self.circuit):
             pass
         else:
             raise TypeError("The input_circuit needs to be quafu QuantumCircuit class or openQASM 2.0 string.")
 
         if self.transpile:
-            transpiled_openqasm, used_vqpu, transpiled_circuit_depth, swap_count = self.call_transpiler(self.circuit)
+            transpiled_openqasm, used_vqpu, swap_count = self.call_transpiler(self.circuit)
             # Reset qubits to real physical qubits
             qpu = query_qpu(QPUs, qpu_name=used_vqpu.qpu_name)
             compiled_openqasm = reset_real_qubits(transpiled_openqasm, len(qpu[0].int_to_qubit), used_vqpu.vq_to_q)
         else:
-            compiled_openqasm, used_vqpu, transpiled_circuit_depth, swap_count = self.call_untranspiler(self.circuit)
-            q_to_vq = {q: vq for vq, q in used_vqpu.vq_to_q.items()}
-            transpiled_openqasm = reset_real_qubits(compiled_openqasm, len(q_to_vq), q_to_vq)
+            compiled_openqasm, used_vqpu, swap_count = self.call_untranspiler(self.circuit)
+            transpiled_openqasm = reset_real_qubits(compiled_openqasm, len(used_vqpu.q_to_vq), used_vqpu.q_to_vq)
 
             qpu = query_qpu(QPUs, qpu_name=used_vqpu.qpu_name)
 
         # Calculate compile time
         compile_time = time.time() - compile_begin_time
 
+        # Parse the compiled openqasm once, the checks and statistics below all read from it.
+        parsed_qasm = parse_qasm_once(compiled_openqasm)
+
         # Check if openqasm satisfies the qubit coupling graph of the hardware
         # and check the number of single-qubit and two-qubit gates.
-        check_qasm, single_nums, two_nums = check_openqasm(compiled_openqasm, qpu[0].structure,
+        check_qasm, single_nums, two_nums = check_openqasm(parsed_qasm, qpu[0].structure,
                                                            len(qpu[0].int_to_qubit))
         try:
             int(check_qasm)
@@ -123,7 +123,7 @@ class Compiler:
             print(check_qasm)
 
         # Get final_qubit2cbit and compiled_circuit_information
-        measure_q2c = final_measure_mapping(compiled_openqasm)
+        measure_q2c = final_measure_mapping(parsed_qasm)
 
         measure_qubits = sorted(measure_q2c, key=measure_q2c.get)
         compiled_circuit_information = {'transpiled_qasm': transpiled_openqasm,
@@ -133,19 +133,16 @@ class Compiler:
                                         'basis_gates': used_vqpu.basis_gates,
                                         'number_of_single_gate': single_nums,
                                         'number_of_two_gate': two_nums,
-                                        'compiled_circuit_depth': transpiled_circuit_depth,
+                                        'compiled_circuit_depth': circuit_depth(parsed_qasm),
                                         'number_of_qubits_used': len(measure_qubits),
                                         'hardware_qubits_for_measure': measure_qubits,
                                         'hardware_qubits_to_cbits': measure_q2c,
                                         'compile_time (s)': compile_time}
         return compiled_openqasm, measure_q2c, compiled_circuit_information
 
-    def _sort_vqpus(self, sort_attribute: str = "coupling_list"):
+    def _sort_vqpus(self):
         # TODO: Sort by QPU estimated free time, then by fidelity
-        def calculate_product(vqpu):
-            return reduce(operator.mul, (item[2] for item in getattr(vqpu, sort_attribute)), 1)
-
-        return sorted(self.vqpus, key=calculate_product, reverse=True)
+        return sort_vqpus(self.vqpus)
 
     def find_available_vqpus(self, qubits_num):
         # Finding available vqpus
@@ -165,8 +162,8 @@ class Compiler:
         return available_vqpus
 
     def get_optimal_vqpu(self, qubit_num: int = None):
-        available_vqpus = self.find_available_vqpus(qubit_num)
-        sorted_vqpus = _sort_vqpus(available_vqpus, sort_attribute='coupling_list')
+        # VQPUs are sorted by fidelity when loaded from the database, and the queries keep that order.
+        sorted_vqpus = self.find_available_vqpus(qubit_num)
         if self.vqpu_preferred == "fidelity":
             optimal_vqpu = sorted_vqpus[0]
         elif self.vqpu_preferred == "structure":
@@ -189,35 +186,49 @@ class Compiler:
         input_qasm = reset_qasm_bits(circuit, qubits, cbits)
 
         # Standardized input circuit openqasm, adding measures and barriers at the end.
-        new_circuit = StandardizedCircuit(input_qasm)
-        input_qasm = new_circuit.standardized_circuit()
+        new_circuit = cached_standardized_circuit(input_qasm)
 
         # Finding available vqpus
         # available_vqpus = self.find_available_vqpus(len(qubits))
 
-        if isinstance(input_qasm, quafuQC):
-            logical_circuit = input_qasm
-            qubit_num = logical_circuit.num
-        elif isinstance(input_qasm, str) and 'OPENQASM 2.0' in input_qasm:
-            qreg_name, creg_name, qubit_num, cbit_num = qreg_creg(input_qasm)
-            logical_circuit = quafuQC(qubit_num, cbit_num)
-            logical_circuit.from_openqasm(input_qasm)
-        else:
-            raise TypeError("The input_circuit needs to be quafu QuantumCircuit class or openQASM 2.0 string.")
+        # The register sizes are already known to StandardizedCircuit, no need to parse them again.
+        logical_circuit = new_circuit.to_quafu()
+        qubit_num = new_circuit.qubit_num
 
         used_vqpu = self.get_optimal_vqpu(qubit_num=qubit_num)
         initial_model = self._set_backend_model(used_vqpu)
-        transpiler = Transpiler(initial_model=initial_model)
-        transpiled_circuit = transpiler.transpile(logical_circuit, optimization_level=self.optimization_level)
-        transpiled_openqasm = transpiled_circuit.to_openqasm(with_para=True)
-
-        transpiled_circuit_depth = circuit_depth(transpiled_openqasm)
-
-        swap_count = transpiler.model.datadict['add_swap_count']
-        return transpiled_openqasm, used_vqpu, transpiled_circuit_depth, swap_count
+        if self.qubits_list is not None and fits_coupling(logical_circuit, used_vqpu.coupling_list):
+            # The circuit already acts on coupled qubits of the specified VQPU, layout and routing can be skipped.
+            transpiled_openqasm, swap_count = _transpile(logical_circuit, initial_model, self.optimization_level,
+                                                         layout=False)
+        elif self.repeat > 1:
+            transpiled_openqasm, swap_count = self._repeat_transpile(logical_circuit, initial_model)
+        else:
+            transpiled_openqasm, swap_count = _transpile(logical_circuit, initial_model, self.optimization_level)
+        return transpiled_openqasm, used_vqpu, swap_count
+
+    def _repeat_transpile(self, logical_circuit, initial_model):
+        """
+        Run `repeat` seeded transpilation trials in parallel and keep the best one,
+        i.e. the one with the fewest added swaps, then the smallest depth.
+        """
+        serialized_circuit = dill.dumps(logical_circuit)
+        trials = [(serialized_circuit, initial_model, self.optimization_level, seed) for seed in range(self.repeat)]
+        if sys.platform == 'win32' or multiprocessing.current_process().daemon:
+            # Daemonic workers (e.g. of call_compiler_api_batch) cannot have children, and the threads of the pool
+            # used on Windows would share the seeded global random state, so the trials run one after the other.
+            random_state = random.getstate()
+            try:
+                results = [_transpile_trial(*trial) for trial in trials]
+            finally:
+                random.setstate(random_state)
+        else:
+            with create_pool(len(trials)) as pool:
+                results = pool.starmap(_transpile_trial, trials)
+        return min(results, key=lambda result: (result[1], circuit_depth(result[0])))
 
     def call_untranspiler(self, circuit: str):
-        if 'OPENQASM 2.0' not in circuit:
+        if not is_openqasm2(circuit):
             raise TypeError("The circuit needs to be OpenQASM 2.0 string.")
 
         if self.qpu_name is None:
@@ -243,32 +254,51 @@ class Compiler:
             used_vqpu = generate_specified_vqpu(QPUs, qpu_name=self.qpu_name, qubits_list=used_qubits)[0]
 
         # Standardized input circuit openqasm, adding measures and barriers at the end.
-        new_circuit = StandardizedCircuit(circuit)
-        compiled_openqasm = new_circuit.standardized_circuit()
+        compiled_openqasm = cached_standardized_circuit(circuit).circuit
 
-        compiled_circuit_depth = circuit_depth(compiled_openqasm)
         swap_count = 0
 
-        return compiled_openqasm, used_vqpu, compiled_circuit_depth, swap_count
+        return compiled_openqasm, used_vqpu, swap_count
 
     def _set_backend_model(self, vqpu):
-        backend_properties = {
-            'name': vqpu.vqpu_name,
-            'backend_type': vqpu.backend_type,
-            'qubits_num': vqpu.qubits_num,
-            'coupling_list': vqpu.coupling_list,
-            'basis_gates': eval(vqpu.basis_gates) if isinstance(vqpu.basis_gates, str) else vqpu.basis_gates,
-        }
-        backend_instance = Backend(**backend_properties)
-        initial_model = Model(backend=backend_instance)
-        return initial_model
+        return _set_backend_model(vqpu)
 
 
-def _sort_vqpus(vqpus, sort_attribute=None):
-    def calculate_product(vqpu):
-        return reduce(operator.mul, (item[2] for item in getattr(vqpu, sort_attribute)), 1)
+def _transpile(circuit, initial_model, optimization_level, layout=True):
+    """
+    Transpile a circuit once.
 
-    return sorted(vqpus, key=calculate_product, reverse=True)
+    Args:
+        circuit (quafu.QuantumCircuit): The logical circuit.
+        initial_model (Model): The model of the backend the circuit is transpiled for.
+        optimization_level (int): Optimization level of the preset passflow.
+        layout (bool): If False, drop the SabreLayout pass and keep the trivial layout,
+            the circuit must already satisfy the coupling of the backend.
+
+    Returns:
+        transpiled_openqasm (str): The transpiled circuit.
+        swap_count (int): The number of swaps added by routing.
+    """
+    passflow = None
+    if not layout:
+        basis_gates = initial_model.get_backend().get_property('basis_gates')
+        passflow = PresetPassflow(basis_gates, optimization_level=optimization_level).get_passflow()
+        passflow = PassFlow([p for p in passflow.passes if not isinstance(p, SabreLayout)])
+    transpiler = Transpiler(passflow=passflow, initial_model=initial_model)
+    transpiled_circuit = transpiler.transpile(circuit, optimization_level=optimization_level)
+    transpiled_openqasm = transpiled_circuit.to_openqasm(with_para=True)
+    # Only routing adds swaps, a passflow without it leaves no count
+    swap_count = transpiler.model.datadict.get('add_swap_count', 0)
+    return transpiled_openqasm, swap_count
+
+
+def _transpile_trial(serialized_circuit, initial_model, optimization_level, seed):
+    """
+    Worker of `Compiler._repeat_transpile`: seed the layout/routing randomness, then `_transpile`.
+    Each trial works on its own copy of the model, SabreLayout starts from the layout left in it.
+    """
+    random.seed(seed)
+    return _transpile(dill.loads(serialized_circuit), copy.deepcopy(initial_model), optimization_level)
 
 
 def _set_backend_model(vqpu):
@@ -277,42 +307,32 @@ def _set_backend_model(vqpu):
         'backend_type': vqpu.backend_type,
         'qubits_num': vqpu.qubits_num,
         'coupling_list': vqpu.coupling_list,
-        'basis_gates': vqpu.basis_gates,
+        'basis_gates': ast.literal_eval(vqpu.basis_gates) if isinstance(vqpu.basis_gates, str) else vqpu.basis_gates,
     }
     backend_instance = Backend(**backend_properties)
     initial_model = Model(backend=backend_instance)
     return initial_model
 
 
-def final_measure_mapping(compiled_openqasm):
+def fits_coupling(circuit, coupling_list):
     """
-    Get measurements from final compiled QASM.
-
+    Check whether every two-qubit gate of a circuit acts on a coupled pair of qubits, in the coupling's direction.
     Args:
-        compiled_openqasm(string): OpenQASM 2.0
-
+        circuit (quafu.QuantumCircuit): The logical circuit.
+        coupling_list (list): List of couplings, where each element is a list [q1, q2, value].
     Returns:
-        final_measure_q2c(dict): {physics_bit: classical_bit, ...}
-
+        bool: True if the circuit can run with the trivial layout, without any swap.
     """
-    if 'OPENQASM' not in compiled_openqasm:
-        print('Warning: need openqasm string! Check if openqasm headers are included!')
-    if 'creg' not in compiled_openqasm:
-        print('Warning: The circuit has no classic registers!')
-    if 'measure' not in compiled_openqasm:
-        print('Warning: The circuit has no measure!')
-    qasm_str_list = compiled_openqasm.replace('\n', '').split(';')
-    measure_str_list = []
-    for elem in qasm_str_list:
-        if 'measure' in elem:
-            measure_str_list.append(elem)
-
-    final_measure_q2c = {}
-    for measure in measure_str_list:
-        measure_mapping = re.findall(r"\d+\.?\d*", measure)
-        measure_mapping = [int(bit) for bit in measure_mapping]
-        final_measure_q2c.update({measure_mapping[0]: measure_mapping[1]})
-    return final_measure_q2c
+    # The couplings are directed, like the legal matrix of check_openqasm
+    edges = {(coupling[0], coupling[1]) for coupling in coupling_list}
+    for gate in circuit.gates:
+        pos = gate.pos if isinstance(gate.pos, list) else [gate.pos]
+        if gate.name == 'barrier' or len(pos) == 1:
+            continue
+        # Gates on more than two qubits are unrolled to two-qubit gates first, leave those to the router.
+        if len(pos) > 2 or tuple(pos) not in edges:
+            return False
+    return True
 
 
 def get_qubits_from_couplings(coupling_list):
@@ -323,7 +343,6 @@ def get_qubits_from_couplings(coupling_list):
     Returns:
         list: Unique qubit indices.
     """
-    unique_qubits = set()
-    for coupling in coupling_list:
-        unique_qubits.update(coupling[:2])
-    return sorted(list(unique_qubits))
+    qubits = np.fromiter((q for coupling in coupling_list for q in coupling[:2]), dtype=np.int64,
+                         count=2 * len(coupling_list))
+    return np.unique(qubits).tolist()
@@ -15,15 +15,45 @@
 # limitations under the License.
 
 
-import re
 import warnings
-from qsteed.compiler.qasm_parser import qreg_creg
+from functools import lru_cache
+from typing import Tuple, Union
 
+import numpy as np
 
-def check_openqasm(qasm, coupling_list, chip_qubit_num):
+from qsteed.compiler.qasm_parser import ParsedQASM, parse_qasm_once
+
+# Limits on the gate counts of a circuit, the messages are only formatted when a limit is hit
+MAX_TWO_QUBIT_GATES = 100000
+MAX_SINGLE_QUBIT_GATES = 5000000
+_ERR_TWO_QUBIT_GATES = f"Error: The number of two-qubit gates cannot exceed {MAX_TWO_QUBIT_GATES}!" \
+                       " The compiled circuit contains {} two-qubit gates."
+_ERR_SINGLE_QUBIT_GATES = f"Error: The number of single-qubit gates cannot exceed {MAX_SINGLE_QUBIT_GATES}!" \
+                          " The compiled circuit contains {} single qubit gates."
+_WARN_EMPTY_CIRCUIT = "Warning: this is an empty circuit!"
+
+
+@lru_cache(maxsize=32)
+def legal_matrix(couplings: Tuple[Tuple[int, int], ...], chip_qubit_num: int) -> np.ndarray:
+    """ Build the legal-coupling matrix of a chip, cached per coupling graph.
+    Args:
+        couplings: the qubit coupling graph of the hardware as a tuple of (control, target) pairs
+        chip_qubit_num: number of chip qubits
+    Returns:
+        np.ndarray: read-only bool matrix, `matrix[i, j]` is True if the gate on qubits (i, j) is allowed
+    """
+    matrix = np.zeros((chip_qubit_num, chip_qubit_num), dtype=np.bool_)
+    if couplings:
+        rows, cols = zip(*couplings)
+        matrix[list(rows), list(cols)] = True
+    matrix.flags.writeable = False
+    return matrix
+
+
+def check_openqasm(qasm: Union[str, bytes, ParsedQASM], coupling_list, chip_qubit_num):
     """ Compile the input openqasm into quafu hardware executable openqasm.
     Args:
-        qasm: openqasm 2.0 string
+        qasm: openqasm 2.0 string or ASCII bytes, or its `parse_qasm_once` result
         coupling_list: the qubit coupling graph of the hardware: [[0,1],[1,0],[1,2],...]
         chip_qubit_num:
     Returns:
@@ -31,63 +61,54 @@ def check_openqasm(qasm, coupling_list, chip_qubit_num):
         single_nums: single-qubit gate counts
         two_nums: two-qubit gate counts
     """
-    qreg_name, creg_name, qubit_num, cbit_num = qreg_creg(qasm)
-    if 'OPENQASM' not in qasm:
+    parsed = qasm if isinstance(qasm, ParsedQASM) else parse_qasm_once(qasm)
+    if not parsed.has_header:
         warnings.warn("Need openqasm string! Check if openqasm headers are included!")
-    qasm_str_list = qasm.strip().splitlines()
-    gate_str_list = []
-    measure_str_list = []
-    header_str_list = []
-    for elem in qasm_str_list:
-        if 'measure' in elem or 'barrier' in elem:
-            measure_str_list.append(elem)
-        elif 'OPENQASM' in elem or 'include' in elem:
-            header_str_list.append(elem)
-        elif 'qreg' in elem or 'creg' in elem:
-            header_str_list.append(elem)
-            required_qubits = int(re.findall(r'(\d+)', elem)[0])
-            # Check if the number of required qubits exceeds the number of chip qubits.
-            if required_qubits > chip_qubit_num:
-                raise Exception("The required number of qubits is %s, which exceeds the number of " \
-                                "chip qubits by %s." % (required_qubits, chip_qubit_num))
+
+    for required_qubits in parsed.register_sizes:
+        # Check if the number of required qubits exceeds the number of chip qubits.
+        if required_qubits > chip_qubit_num:
+            raise Exception("The required number of qubits is %s, which exceeds the number of " \
+                            "chip qubits by %s." % (required_qubits, chip_qubit_num))
+
+    couplings = tuple((coupling[0], coupling[1]) for coupling in coupling_list)
+
+    # Gather the qubits of all gates, then check them at once
+    gates = parsed.gates
+    sizes, q0, q1 = parsed.gate_arrays
+    checked = parsed.checked_gates
+    single = checked & (sizes == 1)
+    two = checked & (sizes == 2)
+
+    # Check if openqasm satisfies the qubit coupling graph of the hardware
+    coupled = np.zeros(len(gates), dtype=np.bool_)
+    in_chip = two & (q0 < chip_qubit_num) & (q1 < chip_qubit_num)
+    # Get the legal matrix of the coupling_list, built once per coupling graph
+    legal = legal_matrix(couplings, chip_qubit_num)
+    coupled[in_chip] = legal[q0[in_chip], q1[in_chip]]
+
+    illegal = (single & (q0 > chip_qubit_num)) | (two & ~coupled)
+    if illegal.any():
+        # Report the first illegal gate
+        index = int(np.argmax(illegal))
+        # The statement text is only rebuilt for the gate being reported
+        line = parsed.statement(index)
+        qubits = gates[index][2]
+        if single[index]:
+            raise Exception(f"{line} exceeds system qubits number %s" % chip_qubit_num)
         else:
-            gate_str_list.append(elem)
-
-    # Build the legal matrix according to the coupling_list
-    legal_matrix = [[False for _ in range(chip_qubit_num)] for _ in range(chip_qubit_num)]
-    for coupling in coupling_list:
-        legal_matrix[coupling[0]][coupling[1]] = True
-
-    single_nums = 0
-    two_nums = 0
-    for line in gate_str_list:
-        gate_match = re.match(fr'(\w+)\s*(\(.*?\))?\s+{qreg_name}\[(\d+)\](?:,{qreg_name}\[(\d+)\])?;', line)
-        if gate_match:
-            qubits = [int(q) for q in gate_match.groups()[2:] if q is not None]
-            if len(qubits) == 1:
-                single_nums += 1
-                if qubits[0] > chip_qubit_num:
-                    raise Exception(f"{line} exceeds system qubits number %s" % chip_qubit_num)
-            elif len(qubits) == 2:
-                # Check if openqasm satisfies the qubit coupling graph of the hardware
-                two_nums += 1
-                if legal_matrix[qubits[0]][qubits[1]]:
-                    continue
-                else:
-                    raise ValueError(f"Error: illegal gate '{line}'" +
-                                     f", qubits {qubits[0]} and {qubits[1]} are not directly coupled.")
-            else:
-                raise ValueError(f"Error: illegal gate '{line}'" +
-                                 ", quantum gate exceeding 2-qubits are not supported.")
+            raise ValueError(f"Error: illegal gate '{line}'" +
+                             f", qubits {qubits[0]} and {qubits[1]} are not directly coupled.")
+    # count_nonzero counts the bool masks directly, without summing them as integers
+    single_nums = int(np.count_nonzero(single))
+    two_nums = int(np.count_nonzero(two))
 
     # Check the number of single-qubit and two-qubit gates
-    if two_nums > 100000:
-        return "Error: The number of two-qubit gates cannot exceed 100000!" \
-               + " The compiled circuit contains " + str(two_nums) + " two-qubit gates.", single_nums, two_nums
-    elif single_nums > 5000000:
-        return "Error: The number of single-qubit gates cannot exceed 5000000!" \
-               + " The compiled circuit contains " + str(single_nums) + " single qubit gates.", single_nums, two_nums
+    if two_nums > MAX_TWO_QUBIT_GATES:
+        return _ERR_TWO_QUBIT_GATES.format(two_nums), single_nums, two_nums
+    elif single_nums > MAX_SINGLE_QUBIT_GATES:
+        return _ERR_SINGLE_QUBIT_GATES.format(single_nums), single_nums, two_nums
     elif single_nums == 0 and two_nums == 0:
-        return "Warning: this is an empty circuit!", single_nums, two_nums
+        return _WARN_EMPTY_CIRCUIT, single_nums, two_nums
 
     return True, single_nums, two_nums
@@ -15,11 +15,265 @@
 # limitations under the License.
 
 
+import dataclasses
 import re
-from collections import defaultdict
+from functools import cached_property, lru_cache
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
 
 # from numpy import pi
 
+_QASM_HEADER_RE = re.compile(r'\s*OPENQASM\s+2\.0')
+# A statement, its leading word (gate name or keyword) and its operands after the optional parameters
+_STATEMENT_RE = re.compile(r'\s*((\w*)\s*(?:\([^;]*?\))?\s*([^;]*?))\s*;')
+# Same as _STATEMENT_RE, but one- and two-qubit operands are captured directly as indices (groups 3 and 4),
+# other operands fall through to group 5
+_GATE_RE = re.compile(r'\s*(?:(\w*)\s*(?:\([^;]*?\))?\s*'
+                      r'(?:\w+\[(\d+)](?:\s*,\s*\w+\[(\d+)])?\s*;|([^;]*?)\s*;))')
+_MEASURE_RE = re.compile(r'measure\s+\w+\[(\d+)]\s*->\s*\w+\[(\d+)]')
+_REGISTER_RE = re.compile(r'(qreg|creg)\s+(\w+)\[(\d+)]')
+_INDEX_RE = re.compile(r'\[(\d+)]')
+_REGISTER_DECL_RE = re.compile(r'(qreg|creg)\s+(\w+)\[(\d+)\];')
+_MEASURE_NAMES_RE = re.compile(r'measure\s+(\w+)\[\d+]\s+->\s+(\w+)\[\d+]')
+_FIRST_TOKEN_RE = re.compile(r'\s*(\w+)')
+_DELAY_DT_RE = re.compile(r'delay\((\d+)dt\)')
+_QREG_DECL_RE = re.compile(r'qreg\s+\w+\[\d+\];')
+# Kind of a QASM line by its first token, any other line is a gate
+_LINE_KINDS = {'measure': 'measure', 'barrier': 'measure',
+               'OPENQASM': 'header', 'include': 'header', 'qreg': 'header', 'creg': 'header'}
+
+
+def is_openqasm2(qasm) -> bool:
+    """
+    Check whether `qasm` is an OpenQASM 2.0 string.
+
+    Only the beginning of the string is matched, since the header must be the first statement.
+
+    Args:
+        qasm: the object to check
+
+    Returns:
+        bool: True if `qasm` is a string starting with the 'OPENQASM 2.0' header
+    """
+    return isinstance(qasm, str) and _QASM_HEADER_RE.match(qasm) is not None
+
+
+def iter_statements(qasm: str) -> Iterator[str]:
+    """
+    Lazily yield the statements of an OpenQASM 2.0 string in a single scan.
+
+    Args:
+        qasm (str): OpenQASM 2.0 string.
+
+    Yields:
+        str: Each non-empty statement, stripped and without the trailing ';'.
+    """
+    for match in _STATEMENT_RE.finditer(qasm):
+        if match.group(1):
+            yield match.group(1)
+
+
+def _iter_operations(qasm: str) -> Iterator[Tuple[int, str, str, str]]:
+    """Like `iter_statements`, but yield (offset, statement, name, operands) from the same scan."""
+    for match in _STATEMENT_RE.finditer(qasm):
+        if match.group(2) and match.group(3):
+            yield (match.start(1),) + match.groups()
+
+
+def _update_depths(depths: List[int], bits: List[int]):
+    """Place an operation on `bits` one layer after the deepest of them, `depths` is indexed by qubit."""
+    if not bits:
+        return
+    top = max(bits)
+    if top >= len(depths):
+        depths.extend([0] * (top + 1 - len(depths)))
+    if len(bits) == 1:
+        depths[top] += 1
+    else:
+        new_depth = max([depths[bit] for bit in bits]) + 1
+        for bit in bits:
+            depths[bit] = new_depth
+
+
+# Patterns built from register names, compiled once per name/size and reused across calls
+@lru_cache(maxsize=256)
+def _bits_pattern(qreg_name: str, creg_name: str) -> re.Pattern:
+    """Skip qreg/creg/barrier lines, otherwise match a qubit (group 'q') or a measured cbit (group 'c')."""
+    return re.compile(fr'(?P<skip>^.*(?:qreg|creg|barrier).*$)'
+                      fr'|{qreg_name}\[(?P<q>\d+)]|->\s+{creg_name}\[(?P<c>\d+)]', flags=re.MULTILINE)
+
+
+@lru_cache(maxsize=256)
+def _checked_gate_pattern(qreg_name: str) -> re.Pattern:
+    """Match a gate on one qubit or two qubits written as 'q[i]' or 'q[i],q[j]', the gates check_openqasm checks."""
+    return re.compile(fr'\w+\s*(?:\(.*?\))?\s+{qreg_name}\[\d+](?:,{qreg_name}\[\d+])?;')
+
+
+@lru_cache(maxsize=256)
+def _qubit_remap_pattern(qreg_name: str, qubit_num: int) -> re.Pattern:
+    """Match the qreg declaration (group 'decl') or a qubit (group 'index')."""
+    return re.compile(fr'(?P<decl>qreg\s+{qreg_name}\[{qubit_num}])|{qreg_name}\[(?P<index>\d+)]')
+
+
+@lru_cache(maxsize=256)
+def _cbit_remap_pattern(creg_name: str, cbit_num: int) -> re.Pattern:
+    """Match the creg declaration (groups 'decl' and 'end') or a measured cbit (group 'index')."""
+    return re.compile(fr'(?P<decl>creg\s+{creg_name}\[{cbit_num}])(?P<end>;?)|->\s+{creg_name}\[(?P<index>\d+)]')
+
+
+@lru_cache(maxsize=256)
+def _qreg_decl_pattern(qreg_name: str, qubit_num: int) -> re.Pattern:
+    """Match the qreg declaration."""
+    return re.compile(fr'qreg\s+{qreg_name}\[{qubit_num}]')
+
+
+@lru_cache(maxsize=256)
+def _real_qubit_pattern(qreg_name: str) -> re.Pattern:
+    """Match the whole qreg declaration line (group 'decl') or a qubit (group 'index')."""
+    return re.compile(fr'(?P<decl>^.*qreg\s+{qreg_name}.*$)|{qreg_name}\[(?P<index>\d+)]', re.MULTILINE)
+
+
+@lru_cache(maxsize=256)
+def _measure_pair_pattern(qreg_name: str, creg_name: str) -> re.Pattern:
+    """Match the measured qubit and cbit of a line."""
+    return re.compile(fr'{qreg_name}\[(\d+)].*{creg_name}\[(\d+)]')
+
+
+@dataclasses.dataclass
+class ParsedQASM:
+    """
+    The information of an OpenQASM 2.0 string collected by a single pass of `parse_qasm_once`.
+
+    Attributes:
+        has_header (bool): Whether the 'OPENQASM' header is present.
+        qreg_name (str): Name of the (first) quantum register, None if not declared.
+        creg_name (str): Name of the (first) classical register, None if not declared.
+        qubit_num (int): Size of the quantum register.
+        cbit_num (int): Size of the classical register.
+        register_sizes (list): Sizes of all qreg/creg declarations, in order.
+        gates (list): (offset, gate name, qubits) of every gate, excluding measure and barrier.
+            The offset locates the statement in `source`, see `statement`.
+        measures (dict): {qubit: cbit} of all measurements.
+        depth (int): Circuit depth, with the same convention as `circuit_depth`.
+        qubits_used (set): Qubits touched by gates and measurements.
+        cbits_used (set): Classical bits written by measurements.
+        source (str): The parsed OpenQASM 2.0 string.
+    """
+    has_header: bool = False
+    qreg_name: Optional[str] = None
+    creg_name: Optional[str] = None
+    qubit_num: int = 0
+    cbit_num: int = 0
+    register_sizes: List[int] = dataclasses.field(default_factory=list)
+    gates: List[Tuple[int, str, List[int]]] = dataclasses.field(default_factory=list)
+    measures: Dict[int, int] = dataclasses.field(default_factory=dict)
+    depth: int = 0
+    qubits_used: set = dataclasses.field(default_factory=set)
+    cbits_used: set = dataclasses.field(default_factory=set)
+    source: str = dataclasses.field(default='', repr=False)
+
+    def statement(self, index: int) -> str:
+        """
+        Text of a gate, rebuilt from `source` only when it is needed (e.g. for an error message).
+
+        Args:
+            index (int): Position of the gate in `gates`.
+
+        Returns:
+            str: The gate statement, with the trailing ';'.
+        """
+        return _STATEMENT_RE.match(self.source, self.gates[index][0]).group(1) + ';'
+
+    @cached_property
+    def gate_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Struct-of-arrays view of `gates`, built once.
+
+        Returns:
+            sizes, q0, q1 (np.ndarray): number of qubits, first and second qubit of every gate (0 if absent).
+        """
+        num_gates = len(self.gates)
+        columns = np.fromiter(
+            chain.from_iterable((len(bits), bits[0] if bits else 0, bits[1] if len(bits) > 1 else 0)
+                                for _, _, bits in self.gates),
+            dtype=np.int64, count=3 * num_gates).reshape(num_gates, 3)
+        return columns[:, 0], columns[:, 1], columns[:, 2]
+
+    @cached_property
+    def checked_gates(self) -> np.ndarray:
+        """
+        Mask of the gates validated by `check_openqasm`, built once: the gates on one or two qubits of the
+        quantum register whose operands are written without spaces ('q[i]' or 'q[i],q[j]').
+        Other statements (e.g. gates on three qubits) are not validated.
+
+        Returns:
+            np.ndarray: bool array, True for every gate in `gates` to be checked.
+        """
+        if self.qreg_name is None:
+            return np.zeros(len(self.gates), dtype=np.bool_)
+        match = _checked_gate_pattern(self.qreg_name).match
+        source = self.source
+        return np.fromiter((match(source, offset) is not None for offset, _, _ in self.gates),
+                           dtype=np.bool_, count=len(self.gates))
+
+
+def parse_qasm_once(qasm: Union[str, bytes, memoryview]) -> ParsedQASM:
+    """
+    Walk an OpenQASM 2.0 string once and collect everything the compiler needs from it
+    (registers, gates, measurements, depth and used bits).
+
+    Args:
+        qasm (str, bytes or memoryview): OpenQASM 2.0 string, or its ASCII bytes (e.g. a file read in binary mode).
+
+    Returns:
+        ParsedQASM: The parsed information.
+    """
+    if not isinstance(qasm, str):
+        # Decoded once into a compact ASCII str (one byte per character), then scanned in place
+        qasm = str(qasm, 'ascii')
+    parsed = ParsedQASM(source=qasm)
+    names = {}  # one shared string per gate name
+    depths = []  # current depth of each qubit
+    for offset, statement, name, operands in _iter_operations(qasm):
+        if name == 'OPENQASM':
+            parsed.has_header = True
+            continue
+        if name == 'include':
+            continue
+
+        if name == 'qreg' or name == 'creg':
+            register = _REGISTER_RE.match(statement)
+            if register:
+                register_name, size = register.group(2), int(register.group(3))
+                parsed.register_sizes.append(size)
+                if name == 'qreg' and parsed.qreg_name is None:
+                    parsed.qreg_name, parsed.qubit_num = register_name, size
+                elif name == 'creg' and parsed.creg_name is None:
+                    parsed.creg_name, parsed.cbit_num = register_name, size
+                continue
+
+        if name == 'measure':
+            indices = _INDEX_RE.findall(operands)
+            if len(indices) < 2:
+                continue
+            qubit, cbit = int(indices[0]), int(indices[1])
+            parsed.measures[qubit] = cbit
+            parsed.cbits_used.add(cbit)
+            bits = [qubit]
+        else:
+            bits = [int(index) for index in _INDEX_RE.findall(operands)]
+            if name != 'barrier':
+                parsed.gates.append((offset, names.setdefault(name, name), bits))
+
+        _update_depths(depths, bits)
+        if name != 'barrier':
+            parsed.qubits_used.update(bits)
+
+    parsed.depth = max(depths, default=0)
+    return parsed
+
 
 def qreg_creg(circuit: str):
     """
@@ -34,30 +288,34 @@ def qreg_creg(circuit: str):
         qubit_num (int): quantum register size
         cbit_num (int): classical register size
     """
-    if isinstance(circuit, str) and 'OPENQASM 2.0' in circuit and 'include "qelib1.inc"' in circuit:
-        qreg_pattern = r'qreg\s+(\w+)\[\d+\];'
-        qubits_pattern = r'qreg\s+\w+\[(\d+)\];'
-        creg_pattern = r'creg\s+(\w+)\[\d+\];'
-        cbits_pattern = r'creg\s+\w+\[(\d+)\];'
-
-        qreg_name = re.search(qreg_pattern, circuit)
-        creg_name = re.search(creg_pattern, circuit)
-        qubits = re.search(qubits_pattern, circuit)
-        cbits = re.search(cbits_pattern, circuit)
-
-        qreg_name = qreg_name.group(1) if qreg_name else None
-        creg_name = creg_name.group(1) if creg_name else None
-        qubit_num = int(qubits.group(1)) if qubits else 0
-        cbit_num = int(cbits.group(1)) if cbits else 0
+    if not isinstance(circuit, str):
+        raise TypeError("Please input a circuit in OpenQASM 2.0 format.")
+    # The helpers below are usually called one after another on the same circuit, parse it only once.
+    return _qreg_creg(circuit)
+
+
+@lru_cache(maxsize=32)
+def _qreg_creg(circuit: str):
+    if 'OPENQASM 2.0' in circuit and 'include "qelib1.inc"' in circuit:
+        # The first qreg and creg declarations, found in a single scan
+        registers = {}
+        for register in _REGISTER_DECL_RE.finditer(circuit):
+            registers.setdefault(register.group(1), register)
+            if len(registers) == 2:
+                break
+        qreg, creg = registers.get('qreg'), registers.get('creg')
+
+        qreg_name, qubit_num = (qreg.group(2), int(qreg.group(3))) if qreg else (None, 0)
+        creg_name, cbit_num = (creg.group(2), int(creg.group(3))) if creg else (None, 0)
     else:
         raise TypeError("Please input a circuit in OpenQASM 2.0 format.")
 
-    measured_names = re.findall(fr'measure\s+{qreg_name}\[\d+]\s+->\s+(\w+)\[\d+]', circuit)
-
-    if measured_names:
-        measured_name = measured_names[0]
-        if measured_name != creg_name:
-            raise NameError("The measurement name do not correspond to the defined classic register name.")
+    # Only the first measurement of the quantum register is checked
+    for measure in _MEASURE_NAMES_RE.finditer(circuit):
+        if measure.group(1) == qreg_name:
+            if measure.group(2) != creg_name:
+                raise NameError("The measurement name do not correspond to the defined classic register name.")
+            break
 
     return qreg_name, creg_name, qubit_num, cbit_num
 
@@ -75,15 +333,22 @@ def actually_bits(input_qasm: str):
     """
     qreg_name, creg_name, qubit_num, cbit_num = qreg_creg(input_qasm)
 
-    filtered_qasm = re.sub(r'^.*(qreg|creg|barrier).*$\n?', '', input_qasm, flags=re.MULTILINE)
+    # One scan: lines declaring registers or barriers are skipped whole, the rest yield qubits and cbits
+    pattern = _bits_pattern(qreg_name, creg_name)
+    # The qreg name may also match at the end of the creg name
+    creg_ends_with_qreg = creg_name is not None and qreg_name is not None and creg_name.endswith(qreg_name)
 
-    # Extracting qubits
-    qubit_matches = re.findall(fr'(?<!qreg\s)(?<!barrier\s){qreg_name}\[(\d+)]', filtered_qasm)
-    qubits = sorted(map(int, set(qubit_matches)))
+    # Deduplicate the index strings first, so only the distinct bits are converted and sorted
+    matches = pattern.findall(input_qasm)
+    qubit_matches = {qubit for _, qubit, _ in matches}
+    cbit_matches = {cbit for _, _, cbit in matches}
+    qubit_matches.discard('')
+    cbit_matches.discard('')
+    if creg_ends_with_qreg:
+        qubit_matches |= cbit_matches
 
-    # Extracting cbits
-    cbit_matches = re.findall(fr'->\s+{creg_name}\[(\d+)]', filtered_qasm)
-    cbits = sorted(map(int, set(cbit_matches)))
+    qubits = sorted(map(int, qubit_matches))
+    cbits = sorted(map(int, cbit_matches))
 
     return qubits, cbits
 
@@ -99,18 +364,15 @@ def insert_creg(qasm: str, cbits: int, creg_name: str = None) -> str:
     Returns:
         str: Modified OpenQASM 2.0 code with creg added.
     """
-    # Define the regex pattern for matching qreg definitions
-    qreg_pattern = fr'(qreg\s+\w+\[\d+\];)'
-
     # Replacement function to insert creg after qreg
     if creg_name is None:
         creg_name = "c"
 
     def replacement(match):
-        return fr'{match.group(0)}\ncreg\s+{creg_name}\[{cbits}];'
+        return f'{match.group(0)}\ncreg {creg_name}[{cbits}];'
 
-    # Perform the substitution
-    return re.sub(qreg_pattern, replacement, qasm)
+    # Perform the substitution after the first qreg definition
+    return _QREG_DECL_RE.sub(replacement, qasm, count=1)
 
 
 def reset_qasm_bits(input_qasm: str, qubits: list, cbits: list):
@@ -128,30 +390,32 @@ def reset_qasm_bits(input_qasm: str, qubits: list, cbits: list):
     qreg_name, creg_name, qubit_num, cbit_num = qreg_creg(input_qasm)
     used_qubit_num = len(qubits)
     used_cbit_num = len(cbits)
-    input_qasm = re.sub(fr'qreg\s+{qreg_name}\[{qubit_num}]', fr'qreg usedqubits[{used_qubit_num}]', input_qasm)
 
+    # Physical to logical index, bits not in the lists keep their index
+    q_to_lq = {q: lq for lq, q in enumerate(qubits)}
+    c_to_lc = {c: lc for lc, c in enumerate(cbits)}
+
+    def replace_qubit(match):
+        if match.group('decl'):
+            return f'qreg {qreg_name}[{used_qubit_num}]'
+        q = int(match.group('index'))
+        return f'{qreg_name}[{q_to_lq[q]}]' if q in q_to_lq else match.group(0)
+
+    def replace_cbit(match):
+        if match.group('decl'):
+            if used_cbit_num == 0:
+                return '' if match.group('end') else match.group(0)
+            return f'creg {creg_name}[{used_cbit_num}]{match.group("end")}'
+        c = int(match.group('index'))
+        return f'-> {creg_name}[{c_to_lc[c]}]' if c in c_to_lc else match.group(0)
+
+    # Resize the qreg and remap the qubits in one pass, the same for the creg and the measured cbits
+    input_qasm = _qubit_remap_pattern(qreg_name, qubit_num).sub(replace_qubit, input_qasm)
     if 'creg' in input_qasm:
-        if used_cbit_num == 0:
-            input_qasm = re.sub(fr'creg\s+{creg_name}\[{cbit_num}];', '', input_qasm)
-        else:
-            input_qasm = re.sub(fr'creg\s+{creg_name}\[{cbit_num}]', fr'creg usedcbits[{used_cbit_num}]', input_qasm)
-
+        input_qasm = _cbit_remap_pattern(creg_name, cbit_num).sub(replace_cbit, input_qasm)
     else:
         input_qasm = insert_creg(input_qasm, len(cbits), creg_name)
 
-    lq_to_q = {q: qubits[q] for q in range(len(qubits))}
-    lc_to_c = {c: cbits[c] for c in range(len(cbits))}
-
-    for lq, q in sorted(lq_to_q.items(), key=lambda item: item[1], reverse=True):
-        input_qasm = re.sub(fr'{qreg_name}\[{q}]', fr'qreset[{lq}]', input_qasm)
-    for lc, c in sorted(lc_to_c.items(), key=lambda item: item[1], reverse=True):
-        input_qasm = re.sub(fr'->\s+{creg_name}\[{c}]', fr'-> creset[{lc}]', input_qasm)
-
-    input_qasm = re.sub(fr'->\s+creset\[', fr'-> {creg_name}[', input_qasm)
-    input_qasm = re.sub(fr'qreset\[', fr'{qreg_name}[', input_qasm)
-    input_qasm = re.sub(fr'qreg\s+usedqubits\[', fr'qreg {qreg_name}[', input_qasm)
-    input_qasm = re.sub(fr'creg\s+usedcbits\[', fr'creg {creg_name}[', input_qasm)
-
     return input_qasm
 
 
@@ -169,29 +433,19 @@ def reset_real_qubits(compiled_openqasm: str, physical_qubits: int, req_to_q: di
     """
     qreg_name, creg_name, qubit_num, cbit_num = qreg_creg(compiled_openqasm)
 
-    compiled_openqasm = re.sub(fr'qreg\s+{qreg_name}\[{qubit_num}]', fr'qreg {qreg_name}[{physical_qubits}]',
-                               compiled_openqasm)
+    compiled_openqasm = _qreg_decl_pattern(qreg_name, qubit_num).sub(f'qreg {qreg_name}[{physical_qubits}]',
+                                                                     compiled_openqasm)
 
     def replace_match(match):
-        qubit_index = int(match.group(1))
-        return fr"{qreg_name}[{req_to_q.get(qubit_index, qubit_index)}]"
-
-    qreg_pattern = fr'qreg\s+{qreg_name}'
-    qreg_lines = re.findall(qreg_pattern, compiled_openqasm)
-
-    def replace_gate_lines(qasm):
-        lines = qasm.splitlines()
-        processed_lines = []
-        for line in lines:
-            if any(decl in line for decl in qreg_lines):
-                processed_lines.append(line)
-            else:
-                line = re.sub(fr'{qreg_name}\[(\d+)]', replace_match, line)
-                processed_lines.append(line)
-        return '\n'.join(processed_lines)
+        if match.group('decl') is not None:
+            # Leave the qreg declaration line untouched
+            return match.group('decl')
+        qubit_index = int(match.group('index'))
+        return f"{qreg_name}[{req_to_q.get(qubit_index, qubit_index)}]"
 
-    compiled_openqasm = replace_gate_lines(compiled_openqasm)
-    compiled_openqasm = re.sub(fr"delay\((\d+)dt\)", fr"delay(\1ns)", compiled_openqasm)
+    # Remap all qubit indices in one pass over the string
+    compiled_openqasm = _real_qubit_pattern(qreg_name).sub(replace_match, compiled_openqasm)
+    compiled_openqasm = _DELAY_DT_RE.sub(r'delay(\1ns)', compiled_openqasm)
 
     return compiled_openqasm
 
@@ -217,75 +471,73 @@ def reorder(qasm):
 
     # qasm_str_list = qasm.replace('\n', '').split(';')
     qasm_str_list = qasm.strip().splitlines()
-    gate_str_list = []
-    measure_str_list = []
-    header_str_list = []
+    str_lists = {'gate': [], 'measure': [], 'header': []}
     for elem in qasm_str_list:
-        if 'measure' in elem or 'barrier' in elem:
-            measure_str_list.append(elem)
-        elif 'OPENQASM' in elem or 'include' in elem or 'qreg' in elem or 'creg' in elem:
-            header_str_list.append(elem)
-        else:
-            gate_str_list.append(elem)
-
-    num_qubit = int(re.findall(r"\d+\.?\d*", qasm.split('qreg')[1].split(';')[0])[0])
+        token = _FIRST_TOKEN_RE.match(elem)
+        str_lists[_LINE_KINDS.get(token.group(1), 'gate') if token else 'gate'].append(elem)
+    gate_str_list = str_lists['gate']
+    measure_str_list = str_lists['measure']
+    header_str_list = str_lists['header']
+
+    # Register sizes and qubit indices are the digits between '[' and ']'
+    qreg_decl = qasm.split('qreg')[1].split(';')[0]
+    num_qubit = int(qreg_decl[qreg_decl.index('[') + 1:qreg_decl.index(']')])
     depth_qubit = [0] * num_qubit
-    gate_list = []
+    gate_strs = []
+    gate_depths = []
     for gate_str in gate_str_list:
         if '[' in gate_str:
-            gate = gate_str.split()
-            gate_qubits = re.findall(r"\d+\.?\d*", gate[1])
-            gate_qubits = [int(qubit) for qubit in gate_qubits]
-            if (len(gate_qubits) == 1):
-                qubit = gate_qubits[0]
-                depth_gate = depth_qubit[qubit] + 1
-                depth_qubit[qubit] = depth_gate
-                gate_list.append([gate_str, depth_gate])
+            operands = gate_str.split()[1]
+            left = operands.index('[')
+            right = operands.index(']', left)
+            qubit1 = int(operands[left + 1:right])
+            left = operands.find('[', right)
+            if left == -1:
+                depth_gate = depth_qubit[qubit1] + 1
+                depth_qubit[qubit1] = depth_gate
             else:
-                qubit1 = gate_qubits[0]
-                qubit2 = gate_qubits[1]
+                qubit2 = int(operands[left + 1:operands.index(']', left)])
                 depth_gate = max(depth_qubit[qubit1], depth_qubit[qubit2]) + 1
                 depth_qubit[qubit1] = depth_gate
                 depth_qubit[qubit2] = depth_gate
-                gate_list.append([gate_str, depth_gate])
-    gate_list.sort(key=lambda x: x[1])
-    openqasm_header = ';\n'.join(header_str_list)
-    openqasm_measure = ';\n'.join(measure_str_list)
-    gate_list_without_depth = [gate[0] for gate in gate_list]
-    reordered_str = ';\n'.join(gate_list_without_depth)
-    reordered_str = openqasm_header + ';\n' + reordered_str + ';\n' + openqasm_measure + ';\n'
+            gate_strs.append(gate_str)
+            gate_depths.append(depth_gate)
+    # Stable sort by depth, gates in the same layer keep their original order
+    order = np.argsort(np.array(gate_depths, dtype=np.int64), kind='stable')
+    gate_list_without_depth = [gate_strs[i] for i in order]
+    # Join each section once and concatenate them in a single pass
+    sections = (header_str_list, gate_list_without_depth, measure_str_list)
+    reordered_str = ''.join([';\n'.join(section) + ';\n' for section in sections])
     return reordered_str
 
 
-def final_measure_mapping(compiled_openqasm):
+def final_measure_mapping(compiled_openqasm: Union[str, ParsedQASM]):
     """
     Get measurements from final compiled QASM.
 
     Args:
-        compiled_openqasm(string): OpenQASM 2.0
+        compiled_openqasm(string or ParsedQASM): OpenQASM 2.0, or its `parse_qasm_once` result
 
     Returns:
         final_measure_q2c(dict): {physics_bit: classical_bit, ...}
 
     """
+    if isinstance(compiled_openqasm, ParsedQASM):
+        if not compiled_openqasm.has_header:
+            print('Warning: need openqasm string! Check if openqasm headers are included!')
+        if compiled_openqasm.creg_name is None:
+            print('Warning: The circuit has no classic registers!')
+        if not compiled_openqasm.measures:
+            print('Warning: The circuit has no measure!')
+        return dict(compiled_openqasm.measures)
+
     if 'OPENQASM' not in compiled_openqasm:
         print('Warning: need openqasm string! Check if openqasm headers are included!')
     if 'creg' not in compiled_openqasm:
         print('Warning: The circuit has no classic registers!')
     if 'measure' not in compiled_openqasm:
         print('Warning: The circuit has no measure!')
-    qasm_str_list = compiled_openqasm.replace('\n', '').split(';')
-    measure_str_list = []
-    for elem in qasm_str_list:
-        if 'measure' in elem:
-            measure_str_list.append(elem)
-
-    final_measure_q2c = {}
-    for measure in measure_str_list:
-        measure_mapping = re.findall(r"\d+\.?\d*", measure)
-        measure_mapping = [int(bit) for bit in measure_mapping]
-        final_measure_q2c.update({measure_mapping[0]: measure_mapping[1]})
-    return final_measure_q2c
+    return {int(q): int(c) for q, c in _MEASURE_RE.findall(compiled_openqasm)}
 
 
 def get_measures(qasm):
@@ -298,43 +550,43 @@ def get_measures(qasm):
     """
     qreg_name, creg_name, qubit_num, cbit_num = qreg_creg(qasm)
     measure_str_list = [line for line in qasm.splitlines() if 'measure' in line]
+    measure_pattern = _measure_pair_pattern(qreg_name, creg_name)
     measure_mapping = {
         int(match[0]): int(match[1])
         for line in measure_str_list
-        for match in re.findall(fr'{qreg_name}\[(\d+)].*{creg_name}\[(\d+)]', line)
+        for match in measure_pattern.findall(line)
     }
     return measure_mapping
 
 
-def circuit_depth(qasm: str):
+def circuit_depth(qasm: Union[str, ParsedQASM]):
     """Calculating quantum circuit depth
     Args:
-        qasm (str): The QASM code.
+        qasm (str or ParsedQASM): The QASM code, or its `parse_qasm_once` result.
     Returns:
         depth: quantum circuit depth
     """
-    # Match all operations
-    pattern = r'(\w+)(?:\([^\)]*\))?\s+((?:\w+\[\d+\](?:,\s*)?)*)\s*(?:->\s*\w+\[\d+\])?;'
-    matches = re.findall(pattern, qasm)
-
-    qubit_usage = defaultdict(int)
-    # Iterate over all matching gate operations
-    for gate, bits in matches:
-        if gate not in ['qreg', 'creg']:
-            bit_list = re.findall(r'\w+\[(\d+)]', bits)
-            bit_indices = [int(b) for b in bit_list]
-            # Get the current maximum depth of bits involved
-            current_depth = max([qubit_usage[bit] for bit in bit_indices], default=0)
-            new_depth = current_depth + 1
-            if gate == 'barrier':
-                # barrier operation: synchronize the depth of all bits
-                for bit in bit_indices:
-                    qubit_usage[bit] = new_depth
-            else:
-                for bit in bit_indices:
-                    qubit_usage[bit] = max(qubit_usage[bit], new_depth)
-
-    depth = max(qubit_usage.values(), default=0)
+    if isinstance(qasm, ParsedQASM):
+        return qasm.depth
+
+    depths = []  # current depth of each qubit
+    # Iterate over all gate operations
+    for gate, bit0, bit1, operands in _GATE_RE.findall(qasm):
+        if not gate or gate in ('OPENQASM', 'include', 'qreg', 'creg'):
+            continue
+        if bit0:
+            bit_indices = [int(bit0), int(bit1)] if bit1 else [int(bit0)]
+        elif operands:
+            bit_indices = [int(b) for b in _INDEX_RE.findall(operands)]
+        else:
+            continue
+        if gate == 'measure':
+            # only the measured qubit counts, not the classical bit
+            bit_indices = bit_indices[:1]
+        # barrier operation synchronizes the depth of all its bits, like any other gate
+        _update_depths(depths, bit_indices)
+
+    depth = max(depths, default=0)
 
     return depth
 
@@ -16,9 +16,25 @@
 
 
 import re
+from functools import lru_cache
+
+from quafu import QuantumCircuit
+
 from qsteed.compiler.qasm_parser import qreg_creg
 
 
+@lru_cache(maxsize=256)
+def _register_patterns(qreg_name: str, creg_name: str):
+    """ Compiled measure and qubit-index patterns of the registers, shared by all circuits using them. """
+    measure_re = re.compile(fr'measure\s+{qreg_name}\[(\d+)\]\s+->\s+{creg_name}\[(\d+)\];')
+    qubit_index_re = re.compile(fr'{qreg_name}\[(\d+)')
+    return measure_re, qubit_index_re
+
+
+# Compile the patterns of the usual register names at import, the first circuit then finds them ready
+_register_patterns('q', 'c')
+
+
 class StandardizedCircuit:
     """ Standardize quantum circuit (OpenQASM 2.0) """
 
@@ -43,69 +59,57 @@ class StandardizedCircuit:
             circuit: quafu.QuantumCircuit of reset barrier
         """
         # circuit: qiskit QuantumCircuit
+        self._reset_barrier_lines()
+        self.circuit = "\n".join(self.qasm_lines).strip()
+        return self.circuit
 
-        measure_pattern = fr'measure\s+{self.qreg_name}\[(\d+)\]\s+->\s+{self.creg_name}\[(\d+)\];'
-        measure_matches = re.findall(measure_pattern, self.circuit)
-        measure_qlist = [int(match[0]) for match in measure_matches]
-        measure_clist = [int(match[1]) for match in measure_matches]
-
-        barrier_pattern = fr"barrier\s+((?:{self.qreg_name}\[\d+\],?\s*)+);"
-        barrier_matches = re.findall(barrier_pattern, self.circuit)
-        all_barrier_qubits = []
-        for match in barrier_matches:
-            qubit_indices = re.findall(fr'{self.qreg_name}\[(\d+)', match)
-            barrier_qubits = [int(index) for index in qubit_indices]
-            all_barrier_qubits.append(barrier_qubits)
-
-        # qasm_lines = self.circuit.strip().splitlines()
+    def _reset_barrier_lines(self):
+        """ Reset barrier before measurement, on `qasm_lines` only. """
+        measure_re, qubit_index_re = _register_patterns(self.qreg_name, self.creg_name)
 
-        # Check if there is a barrier before the first measure.
-        barrier_before_measure = False
-        barrier_before_measure_lines = []
+        # One pass over the lines collects the measured qubits, the first measure
+        # and the barriers right before a measure.
+        measure_qlist = []
+        first_measure_index = None
+        barrier_before_measure_indices = []
         for i, line in enumerate(self.qasm_lines):
             if 'measure' in line:
+                if first_measure_index is None:
+                    first_measure_index = i
+                measure_qlist.extend(int(qubit) for qubit, _ in measure_re.findall(line))
                 if i > 0 and 'barrier' in self.qasm_lines[i - 1]:
-                    barrier_before_measure = True
-                    barrier_before_measure_lines.append(self.qasm_lines[i - 1])
-                # break
+                    barrier_before_measure_indices.append(i - 1)
+        barrier_before_measure = len(barrier_before_measure_indices) > 0
         if 'barrier' in self.qasm_lines[-1]:
-            barrier_before_measure_lines.append(self.qasm_lines[-1])
+            barrier_before_measure_indices.append(len(self.qasm_lines) - 1)
 
         # If there is no barrier before the measure, insert a barrier.
         if not barrier_before_measure:
             barrier_qubits = ','.join([fr"{self.qreg_name}[{q}]" for q in measure_qlist])
             barrier_instruction = fr"barrier {barrier_qubits};"
-            first_measure_index = next(i for i, line in enumerate(self.qasm_lines) if 'measure' in line)
             self.qasm_lines.insert(first_measure_index, barrier_instruction)
         else:
-            if len(barrier_before_measure_lines) == 1:
-                qubit_indices = re.findall(fr'{self.qreg_name}\[(\d+)', barrier_before_measure_lines[0])
-                barrier_qubits = set([int(index) for index in qubit_indices])
+            if len(barrier_before_measure_indices) == 1:
+                barrier_index = barrier_before_measure_indices[0]
+                barrier_qubits = set(map(int, qubit_index_re.findall(self.qasm_lines[barrier_index])))
                 # If the qubit sets of the measure and barrier are inconsistent,
                 # delete the original barrier and insert a new barrier.
                 if set(measure_qlist) != barrier_qubits:
-                    last_index = len(self.qasm_lines) - 1 - self.qasm_lines[::-1].index(barrier_before_measure_lines[0])
-                    self.qasm_lines.pop(last_index)
+                    self.qasm_lines.pop(barrier_index)
                     new_barrier_qubits = ','.join([f"{self.qreg_name}[{q}]" for q in measure_qlist])
                     new_barrier_instruction = f"barrier {new_barrier_qubits};"
-                    for i, line in enumerate(self.qasm_lines):
-                        if 'measure' in line:
-                            self.qasm_lines.insert(i, new_barrier_instruction)
-                            break
+                    measure_index = first_measure_index - (barrier_index < first_measure_index)
+                    self.qasm_lines.insert(measure_index, new_barrier_instruction)
             else:
-                for barrier in barrier_before_measure_lines:
-                    last_index = len(self.qasm_lines) - 1 - self.qasm_lines[::-1].index(barrier)
-                    self.qasm_lines.pop(last_index)
+                # Rebuild the lines once without the barriers instead of popping them one by one
+                drop = set(barrier_before_measure_indices)
+                self.qasm_lines = [line for i, line in enumerate(self.qasm_lines) if i not in drop]
 
                 new_barrier_qubits = ','.join([f"{self.qreg_name}[{q}]" for q in measure_qlist])
                 new_barrier_instruction = f"barrier {new_barrier_qubits};"
-                for i, line in enumerate(self.qasm_lines):
-                    if 'measure' in line:
-                        self.qasm_lines.insert(i, new_barrier_instruction)
-                        break
-
-        self.circuit = "\n".join(self.qasm_lines).strip()
-        return self.circuit
+                # The first measure moves up by the number of barriers removed before it
+                measure_index = first_measure_index - sum(1 for i in drop if i < first_measure_index)
+                self.qasm_lines.insert(measure_index, new_barrier_instruction)
 
     def standardized_circuit(self):
         """ Standardize quantum circuit.
@@ -129,22 +133,58 @@ class StandardizedCircuit:
                     self.cbit_num = self.qubit_num
                     self.qasm_lines.insert(i + 1, f"creg {self.creg_name}[{self.cbit_num}];")
                     break
-            self.circuit = "\n".join(self.qasm_lines)
         elif self.creg_name is not None and self.cbit_num == 0:
             self.cbit_num = self.qubit_num
-            self.circuit = self.circuit.replace(f"creg {self.creg_name}[0];", f"creg {self.creg_name}[{self.cbit_num}];")
+            empty_creg = f"creg {self.creg_name}[0];"
+            self.qasm_lines = [line.replace(empty_creg, f"creg {self.creg_name}[{self.cbit_num}];")
+                               if empty_creg in line else line for line in self.qasm_lines]
 
+        # All edits are made on the lines, the string is built once at the end
         if 'measure' not in self.circuit:
             barrier = ','.join([f"{self.qreg_name}[{q}]" for q in range(self.qubit_num)])
-            self.circuit = self.circuit + barrier
-            measures = ''.join(
-                [f"measure {self.qreg_name}[{i}] -> {self.creg_name}[{i}];\n" for i in range(self.qubit_num)])
-            self.circuit = self.circuit + measures
+            self.qasm_lines.append(f"barrier {barrier};")
+            self.qasm_lines.extend(
+                [f"measure {self.qreg_name}[{i}] -> {self.creg_name}[{i}];" for i in range(self.qubit_num)])
         else:
-            self.circuit = self.reset_barrier()
+            self._reset_barrier_lines()
 
-        if self.rename:
-            self.circuit = self.circuit.replace(self.qreg_name + '[', f'{self.rename_qreg}[')
-            self.qasm_lines = self.circuit.strip().splitlines()
+        # A register already named rename_qreg needs no pass over the lines
+        if self.rename and self.qreg_name != self.rename_qreg:
+            qreg_prefix = self.qreg_name + '['
+            renamed_prefix = f'{self.rename_qreg}['
+            self.qasm_lines = [line.replace(qreg_prefix, renamed_prefix) if qreg_prefix in line else line
+                               for line in self.qasm_lines]
 
+        self.circuit = "\n".join(self.qasm_lines).strip()
         return self.circuit
+
+    def to_quafu(self):
+        """ Build a quafu QuantumCircuit from the (standardized) circuit.
+
+        The register sizes tracked by this object are used directly, so the OpenQASM string
+        is only parsed by quafu itself.
+
+        Returns:
+            circuit (quafu.QuantumCircuit): The circuit, with `qubit_num` qubits and `cbit_num` cbits.
+        """
+        circuit = QuantumCircuit(self.qubit_num, self.cbit_num)
+        circuit.from_openqasm(self.circuit)
+        return circuit
+
+
+@lru_cache(maxsize=32)
+def cached_standardized_circuit(circuit: str) -> StandardizedCircuit:
+    """ Standardize a circuit, reusing the result for an OpenQASM string that was standardized before.
+
+    Repeated compilations of the same circuit in one process skip the standardization. Every entry keeps the
+    input string and the standardized circuit alive, so only a few recent circuits are kept, like `_qreg_creg`.
+    The returned object is shared between callers and must not be modified.
+
+    Args:
+        circuit (OpenQASM 2.0): The circuit to standardize.
+    Returns:
+        new_circuit (StandardizedCircuit): The standardized circuit, the OpenQASM string is `new_circuit.circuit`.
+    """
+    new_circuit = StandardizedCircuit(circuit)
+    new_circuit.standardized_circuit()
+    return new_circuit
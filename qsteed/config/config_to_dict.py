@@ -17,6 +17,23 @@
 
 import json
 
+# First characters a JSON document can start with, values starting otherwise are plain strings
+_JSON_START_CHARS = frozenset('{["-0123456789tfnNI')
+
+
+def _parse_value(value):
+    """
+    Parse a configuration value as JSON to support complex types like dictionaries, lists, etc.
+    If parsing fails, retain the original string.
+    """
+    stripped = value.lstrip()
+    if not stripped or stripped[0] not in _JSON_START_CHARS:
+        return value
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
 
 def config_to_dict(config):
     """
@@ -26,11 +43,6 @@ def config_to_dict(config):
     for section in config.sections():
         section_dict = {}
         for key, value in config.items(section):
-            try:
-                # Attempt to parse a string value as JSON to support complex types like dictionaries, lists, etc.
-                section_dict[key] = json.loads(value)
-            except json.JSONDecodeError:
-                # If parsing fails, retain the original string.
-                section_dict[key] = value
+            section_dict[key] = _parse_value(value)
         config_dict[section] = section_dict
     return config_dict
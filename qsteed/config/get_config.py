@@ -18,8 +18,12 @@
 import os
 import sys
 import warnings
+from functools import lru_cache
 
 
+# The location is resolved (and the default configuration warned about) once per user_config_file,
+# later calls do not touch the file system again
+@lru_cache(maxsize=None)
 def get_config(user_config_file=None):
     current_os = sys.platform
     # Determine the location of the user configuration file.
@@ -15,9 +15,9 @@
 # limitations under the License.
 
 import copy
-from typing import Any
+from numbers import Number
+from typing import Any, List
 
-import networkx as nx
 import numpy as np
 from quafu import QuantumCircuit
 from quafu.elements import Barrier, Delay, XYResonance
@@ -25,7 +25,7 @@ from quafu.elements.element_gates import *
 from quafu.elements.element_gates.clifford import *
 from quafu.elements.element_gates.pauli import *
 
-from .dagcircuit import DAGCircuit
+from .dagcircuit import DAGCircuit, qubit_label
 from .instruction_node import InstructionNode
 
 GATE_CLASSES = {
@@ -74,6 +74,15 @@ GATE_CLASSES = {
     "u3": U3Gate,
 }
 
+# GATE_CLASSES also keyed on the names the nodes carry (e.g. 'CX', 'RZ', 'Sdg'), so that node_to_gate
+# usually finds the class without lowering the name first
+_GATE_CLASSES_BY_NAME = {
+    **{name.upper(): gate_class for name, gate_class in GATE_CLASSES.items()},
+    **{gate_class.name: gate_class for gate_class in GATE_CLASSES.values() if isinstance(gate_class.name, str)},
+    **GATE_CLASSES,
+}
+_MULTI_CONTROLLED_GATES = (MCXGate, MCYGate, MCZGate)
+
 
 def gate_to_node(input_gate, specific_label):
     """
@@ -88,19 +97,22 @@ def gate_to_node(input_gate, specific_label):
         node: a node in the graph, with specific label. A node is a InstructionNode object.
 
     """
-    gate = copy.deepcopy(input_gate)  # avoid modifying the original gate
-    if not isinstance(gate.pos, list):  # if gate.pos is not a list, make it a list
-        gate.pos = [gate.pos]
+    # The attributes are read into new objects, the original gate is neither copied nor modified
+    pos = input_gate.pos
+    pos = list(pos) if isinstance(pos, list) else [pos]  # if gate.pos is not a list, make it a list
 
     # use getattr check 'paras' and other attributes if exist. if the attr doesn't exist,return None
-    gate.paras = getattr(gate, 'paras', None) or None
-    gate.duration = getattr(gate, 'duration', None) or None
-    gate.unit = getattr(gate, 'unit', None) or None
+    paras = getattr(input_gate, 'paras', None) or None
+    duration = getattr(input_gate, 'duration', None) or None
+    unit = getattr(input_gate, 'unit', None) or None
 
-    if gate.paras and not isinstance(gate.paras, list):  # if paras is True and not a list, make it a list
-        gate.paras = [gate.paras]
+    if paras:
+        if not isinstance(paras, list):  # if paras is True and not a list, make it a list
+            paras = [paras]
+        # Numbers are immutable and can be shared, symbolic parameters get their own copy
+        paras = list(paras) if all(isinstance(para, Number) for para in paras) else copy.deepcopy(paras)
 
-    hashable_gate = InstructionNode(gate.name, gate.pos, gate.paras, gate.duration, gate.unit, label=specific_label)
+    hashable_gate = InstructionNode(input_gate.name, pos, paras, duration, unit, label=specific_label)
     return hashable_gate
 
 
@@ -127,40 +139,43 @@ def circuit_to_dag(circuit: QuantumCircuit, measure_flag=True):
         # Build the dag graph
         dag = circuit_to_dag(circuit)  #  dag graph
     """
+    gate_nodes = [gate_to_node(gate, specific_label=i) for i, gate in enumerate(circuit.gates)]
+    return _build_dag(gate_nodes, copy.deepcopy(circuit.measures), circuit.num, measure_flag)
 
-    # Initialize variables
-    i = 0
+
+def _build_dag(gate_nodes, measure_pos, qubits, measure_flag):
+    """
+    Wire the gate nodes of a circuit into a DAGCircuit, see circuit_to_dag.
+    """
+    # Initialize variables, the edges are collected first and added to the graph in one batch
     qubit_last_use = {}
+    edges = []
     g = DAGCircuit()
 
-    # Add the start node
+    # Add the start node and the gate nodes in bulk
     start_node = -1
     g.add_node(start_node, color="green")
+    g.add_nodes_from(gate_nodes, color="blue")
 
-    for gate in circuit.gates:
-        # Transform gate to node
-        hashable_gate = gate_to_node(gate, specific_label=i)
-        i += 1
-        g.add_node(hashable_gate, color="blue")
-
-        # Add edges based on qubit_last_use; update last use
+    # Collect edges based on qubit_last_use; update last use
+    for hashable_gate in gate_nodes:
         for qubit in hashable_gate.pos:
             prev_node = qubit_last_use.get(qubit, start_node)
-            g.add_edge(
-                prev_node, hashable_gate, label=f'q{qubit}', color="green" if prev_node == start_node else "black")
+            edges.append((prev_node, hashable_gate, {'label': qubit_label(qubit), 'qubit': qubit,
+                                                     'color': "green" if prev_node == start_node else "black"}))
             qubit_last_use[qubit] = hashable_gate
 
     if measure_flag:
-        # Add measure_gate node
-        measure_pos = copy.deepcopy(circuit.measures)
+        # Add measure_gate node, the only measure node, so it also gives the cbits used
         measure_gate = InstructionNode("measure", measure_pos, None, None, None, label="m")
         g.add_node(measure_gate, color="blue")
+        g.cbits_used = set(measure_gate.pos.values())
 
-        # Add edges from qubit_last_use to measure_gate
+        # Collect edges from qubit_last_use to measure_gate
         for qubit in measure_gate.pos:
             prev_node = qubit_last_use.get(qubit, start_node)
-            g.add_edge(
-                prev_node, measure_gate, label=f'q{qubit}', color="green" if prev_node == start_node else "black")
+            edges.append((prev_node, measure_gate, {'label': qubit_label(qubit), 'qubit': qubit,
+                                                    'color': "green" if prev_node == start_node else "black"}))
             qubit_last_use[qubit] = measure_gate
 
     # Add the end node
@@ -168,13 +183,14 @@ def circuit_to_dag(circuit: QuantumCircuit, measure_flag=True):
     g.add_node(end_node, color="red")
 
     for qubit, last_node in qubit_last_use.items():
-        g.add_edge(last_node, end_node, label=f'q{qubit}', color="red")
+        edges.append((last_node, end_node, {'label': qubit_label(qubit), 'qubit': qubit, 'color': "red"}))
+
+    g._add_edges_in_bulk(edges)
 
     # Update DAGCircuit attributes
     g.update_qubits_used()
-    g.update_cbits_used()
     g.update_num_instruction_nodes()
-    g.update_circuit_qubits(circuit.num)
+    g.update_circuit_qubits(qubits)
 
     return g
 
@@ -204,31 +220,30 @@ def node_to_gate(node_in_dag):
                     qcircuit.gates.append(node_to_gate(gate))
         return qcircuit
     """
-    gate_name = node_in_dag.name.lower()
-    gate_class = GATE_CLASSES.get(gate_name)
+    gate_class = _GATE_CLASSES_BY_NAME.get(node_in_dag.name)
+    if gate_class is None:
+        gate_name = node_in_dag.name.lower()
+        gate_class = GATE_CLASSES.get(gate_name)
 
-    if not gate_class:
-        raise ValueError(f"Gate '{gate_name}' is not supported")
+        if not gate_class:
+            raise ValueError(f"Gate '{gate_name}' is not supported")
 
-    if gate_name == "barrier":
-        return gate_class(node_in_dag.pos)
+    pos = node_in_dag.pos
+    if gate_class is Barrier:
+        return gate_class(pos)
 
-    # Prepare arguments for gate initialization
-    args = node_in_dag.pos
-    if node_in_dag.paras:
-        args += node_in_dag.paras
+    # Handle multi-qubit gates
+    if gate_class in _MULTI_CONTROLLED_GATES:
+        return gate_class(pos[:-1], pos[-1])
 
-    # Handle specific gate types with additional parameters
-    if gate_name in ["delay", "xy"]:
-        args += [node_in_dag.duration, node_in_dag.unit]
+    # The arguments are the qubits followed by the parameters, unpacked without building an argument list
+    paras = node_in_dag.paras or ()
 
-    # Handle multi-qubit gates
-    if gate_name in ["mcx", "mcy", "mcz"]:
-        control_qubits = node_in_dag.pos[:-1]
-        target_qubit = node_in_dag.pos[-1]
-        return gate_class(control_qubits, target_qubit)
+    # Handle specific gate types with additional parameters
+    if gate_class is Delay or gate_class is XYResonance:
+        return gate_class(*pos, *paras, node_in_dag.duration, node_in_dag.unit)
 
-    return gate_class(*args)
+    return gate_class(*pos, *paras)
 
 
 def dag_to_circuit(dep_graph, qubits: int):
@@ -261,12 +276,13 @@ def dag_to_circuit(dep_graph, qubits: int):
     """
 
     qcircuit = QuantumCircuit(qubits)
-    for gate in nx.topological_sort(dep_graph):
-        if gate not in [-1, float('inf')]:
+    gates = qcircuit.gates
+    for gate in dep_graph.topological_sort():
+        if gate != -1 and gate != float('inf'):
             if gate.name == "measure":
                 qcircuit.measures = gate.pos
             else:
-                qcircuit.gates.append(node_to_gate(gate))
+                gates.append(node_to_gate(gate))
     return qcircuit
 
 
@@ -382,8 +398,8 @@ def nodelist_to_dag(op_nodes: List[Any]) -> DAGCircuit:
         # Add edges based on qubit_last_use and update last use
         for qubit in hashable_gate.pos:
             prev_node = qubit_last_use.get(qubit, start_node)
-            g.add_edge(
-                prev_node, hashable_gate, label=f'q{qubit}', color="green" if prev_node == start_node else "black")
+            g.add_edge(prev_node, hashable_gate, label=qubit_label(qubit), qubit=qubit,
+                       color="green" if prev_node == start_node else "black")
             qubit_last_use[qubit] = hashable_gate
 
     # Add the end node
@@ -391,16 +407,23 @@ def nodelist_to_dag(op_nodes: List[Any]) -> DAGCircuit:
     g.add_node(end_node, color="red")
 
     for qubit, last_node in qubit_last_use.items():
-        g.add_edge(last_node, end_node, label=f'q{qubit}', color="red")
+        g.add_edge(last_node, end_node, label=qubit_label(qubit), qubit=qubit, color="red")
 
     # Update DAGCircuit attributes
-    g.qubits_used = g.update_qubits_used()
-    g.cbits_used = g.update_cbits_used()
-    g.num_instruction_nodes = g.update_num_instruction_nodes()
+    g.update_qubits_used()
+    g.update_cbits_used()
+    g.update_num_instruction_nodes()
 
     return g
 
 
+def _sorted_unique_qubits(nodes_list):
+    """
+    Return the sorted list of the qubits used by the nodes, shared by the forward and reverse mappings.
+    """
+    return sorted({qubit for node in nodes_list if getattr(node, 'pos', None) is not None for qubit in node.pos})
+
+
 def nodelist_qubit_mapping_dict(nodes_list):
     """
     Generate a mapping dictionary for qubits used by the nodes to new qubits.
@@ -411,14 +434,8 @@ def nodelist_qubit_mapping_dict(nodes_list):
     Returns:
         nodes_qubit_mapping_dict: a dict where keys are the qubits used by the nodes and values are the new qubits
     """
-    nodes_list_qubits_used = set()
-    for node in nodes_list:
-        if hasattr(node, 'pos') and node.pos is not None:
-            nodes_list_qubits_used.update(node.pos)
-
-    mapping_pos = list(range(len(nodes_list_qubits_used)))
     # Create the mapping dictionary
-    nodes_qubit_mapping_dict = dict(zip(sorted(nodes_list_qubits_used), mapping_pos))
+    nodes_qubit_mapping_dict = {qubit: index for index, qubit in enumerate(_sorted_unique_qubits(nodes_list))}
 
     return nodes_qubit_mapping_dict
 
@@ -433,11 +450,8 @@ def nodelist_qubit_mapping_dict_reverse(nodes_list):
     Returns:
         nodes_qubit_mapping_dict_reverse: a dict where keys are the new qubits and values are the qubits used by the nodes
     """
-    # Generate the initial mapping dictionary
-    nodes_qubit_mapping_dict = nodelist_qubit_mapping_dict(nodes_list)
-
-    # Reverse the mapping
-    nodes_qubit_mapping_dict_reverse = {value: key for key, value in nodes_qubit_mapping_dict.items()}
+    # The new qubits are the positions in the sorted list of used qubits, no need to build the forward mapping
+    nodes_qubit_mapping_dict_reverse = dict(enumerate(_sorted_unique_qubits(nodes_list)))
 
     return nodes_qubit_mapping_dict_reverse
 
@@ -455,11 +469,21 @@ def nodes_list_mapping(nodes_list, nodes_qubit_mapping_dict):
     """
     nodes_mapping = []
     for node in nodes_list:
+        if isinstance(getattr(node, 'pos', None), list):
+            # Only pos is rewritten, so a shallow copy does; the parameters get their own list as with deepcopy
+            node_new = copy.copy(node)
+            node_new.pos = [nodes_qubit_mapping_dict[qubit] for qubit in node.pos]
+            paras = node.paras
+            if isinstance(paras, list) and all(isinstance(para, Number) for para in paras):
+                node_new.paras = list(paras)
+            else:
+                node_new.paras = copy.deepcopy(paras)
+            nodes_mapping.append(node_new)
+            continue
+
         node_new = copy.deepcopy(node)
         if hasattr(node, 'pos') and node.pos is not None:
-            if isinstance(node.pos, list):
-                node_new.pos = [nodes_qubit_mapping_dict[qubit] for qubit in node.pos]
-            elif isinstance(node.pos, dict):
+            if isinstance(node.pos, dict):
                 node_new.pos = {}
                 # The values of the dict are void, so we need to copy the values from the original dict
                 for qubit in node.pos:
@@ -479,11 +503,16 @@ def copy_dag(dag: DAGCircuit):
         dag_copy (DAGCircuit): The copied DAGCircuit.
     """
     dag_copy = DAGCircuit()
-    dag_copy.circuit_qubits = copy.deepcopy(dag.circuit_qubits)
-    dag_copy.qubits_used = copy.deepcopy(dag.qubits_used)
-    dag_copy.cbits_used = copy.deepcopy(dag.cbits_used)
-    dag_copy.num_instruction_nodes = copy.deepcopy(dag.num_instruction_nodes)
-    dag_copy.add_weighted_edges_from(copy.deepcopy(dag.edges(data=True)))
+    dag_copy.circuit_qubits = dag.circuit_qubits
+    dag_copy.qubits_used = copy.copy(dag.qubits_used)
+    dag_copy.cbits_used = copy.copy(dag.cbits_used)
+    dag_copy.num_instruction_nodes = dag.num_instruction_nodes
+
+    # Structural copy: the node objects are shared, the edge and node attribute dicts are copied
+    add_edge = dag_copy.add_edge
+    for u, v, data in dag.edges(data=True):
+        add_edge(u, v, **data)
+    dag_copy.add_nodes_from(dag.nodes(data=True))
     return dag_copy
 
 
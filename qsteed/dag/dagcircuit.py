@@ -14,6 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 from typing import Dict
 
 import networkx as nx
@@ -21,6 +22,33 @@ from networkx.classes.multidigraph import MultiDiGraph
 
 from qsteed.dag.instruction_node import InstructionNode
 
+# Labels 'q0', 'q1', ... of the edges, built once and shared by all the edges on the same qubit
+_QUBIT_LABELS = []
+
+
+def qubit_label(qubit: int) -> str:
+    """
+    Return the label of the edges on the given qubit.
+
+    Args:
+        qubit (int): The qubit of the edge.
+
+    Returns:
+        str: The label of the edge, e.g. 'q0'.
+    """
+    while len(_QUBIT_LABELS) <= qubit:
+        _QUBIT_LABELS.append(f'q{len(_QUBIT_LABELS)}')
+    return _QUBIT_LABELS[qubit]
+
+
+# Colors of the edges keyed by (the edge starts at -1, the edge ends at float('inf'))
+_EDGE_COLORS = {
+    (False, False): {},
+    (True, False): {'color': 'green'},
+    (False, True): {'color': 'red'},
+    (True, True): {'color': 'red'},
+}
+
 
 class DAGCircuit(MultiDiGraph):
     """
@@ -31,6 +59,9 @@ class DAGCircuit(MultiDiGraph):
     dependency between operations. The DAGCircuit is used to optimize the circuit by
     identifying and merging common subcircuits.
     """
+    # The attributes of the DAGCircuit itself, the networkx graph data keep living in the instance __dict__
+    __slots__ = ('qubits_used', 'cbits_used', 'circuit_qubits', 'num_instruction_nodes',
+                 '_topological_order', '_qubits_last_nodes')
 
     def __init__(self, qubits_used=None, cbits_used=None, incoming_graph_data=None, **attr):
         """
@@ -66,9 +97,86 @@ class DAGCircuit(MultiDiGraph):
 
         self.circuit_qubits = None
         self.num_instruction_nodes = 0
+        # Topological order of the nodes, computed on demand and dropped by every structural change
+        self._topological_order = None
+        # {qubit -> last node on the qubit} for appending nodes at the end, dropped by every structural change
+        self._qubits_last_nodes = None
 
     # Add new methods or override existing methods here.
 
+    # The structural changes of the graph go through these methods, they invalidate the cached orders.
+    def _invalidate_caches(self):
+        self._topological_order = None
+        self._qubits_last_nodes = None
+
+    def add_node(self, node_for_adding, **attr):
+        self._invalidate_caches()
+        super().add_node(node_for_adding, **attr)
+
+    def add_nodes_from(self, nodes_for_adding, **attr):
+        self._invalidate_caches()
+        super().add_nodes_from(nodes_for_adding, **attr)
+
+    def remove_node(self, n):
+        self._invalidate_caches()
+        super().remove_node(n)
+
+    def remove_nodes_from(self, nodes):
+        self._invalidate_caches()
+        super().remove_nodes_from(nodes)
+
+    def add_edge(self, u_for_edge, v_for_edge, key=None, **attr):
+        self._invalidate_caches()
+        return super().add_edge(u_for_edge, v_for_edge, key, **attr)
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        self._invalidate_caches()
+        return super().add_edges_from(ebunch_to_add, **attr)
+
+    def remove_edge(self, u, v, key=None):
+        self._invalidate_caches()
+        super().remove_edge(u, v, key)
+
+    def remove_edges_from(self, ebunch):
+        self._invalidate_caches()
+        super().remove_edges_from(ebunch)
+
+    def clear(self):
+        self._invalidate_caches()
+        super().clear()
+
+    def clear_edges(self):
+        self._invalidate_caches()
+        super().clear_edges()
+
+    def _add_nodes_in_bulk(self, nodes):
+        """
+        Add (node, attr) pairs like add_nodes_from, the attributes of the nodes already in the DAGCircuit are updated.
+        This fills the node and adjacency dicts directly instead of going through the networkx API per node.
+        """
+        self._invalidate_caches()
+        for node, attr in nodes:
+            if node in self._node:
+                self._node[node].update(attr)
+            else:
+                self._node[node] = dict(attr)
+                self._succ[node] = self.adjlist_inner_dict_factory()
+                self._pred[node] = self.adjlist_inner_dict_factory()
+
+    def _add_edges_in_bulk(self, edges):
+        """
+        Add (u, v, data) edges between nodes already in the DAGCircuit, in order, with the keys add_edge would give
+        them as long as no edge between u and v has been removed. This fills the adjacency dicts directly,
+        add_edges_from goes through add_edge for every edge of a MultiDiGraph.
+        """
+        self._invalidate_caches()
+        succ, pred = self._succ, self._pred
+        for u, v, data in edges:
+            keydict = succ[u].get(v)
+            if keydict is None:
+                keydict = succ[u][v] = pred[v][u] = {}
+            keydict[len(keydict)] = data
+
     def update_circuit_qubits(self, circuit_qubits: int) -> int:
         """
         Update the number of qubits in the quantum circuit.
@@ -86,30 +194,33 @@ class DAGCircuit(MultiDiGraph):
         """
         Update and return the set of qubits used in the DAGCircuit.
 
-        The qubits used are determined based on the labels of the edges connected to node -1.
-        The qubits are the integer part of the label.
+        The qubits used are determined based on the edges connected to node -1.
+        The qubits are the 'qubit' attribute of the edges, stored next to their 'q<n>' label.
+        The methods adding and removing instruction nodes keep qubits_used up to date themselves,
+        this recomputes it from the edges, e.g. after changing the graph through the networkx methods.
 
         Returns:
             qubits_used (set): The set of qubits used in the DAGCircuit.
         """
-        if -1 not in self.nodes:
+        if -1 not in self._node:
             raise ValueError('-1 should be in DAGCircuit, please add it first')
 
-        self.qubits_used = set([int(edge[2]['label'][1:]) for edge in self.out_edges(-1, data=True)])
+        self.qubits_used = {data['qubit'] for _, _, data in self.out_edges(-1, data=True)}
         return self.qubits_used
 
     def update_cbits_used(self) -> set:
         """
         Update and return the set of classical bits (cbits) used in the DAGCircuit.
 
-        The cbits used are determined based on the positions of measure nodes in the DAGCircuit.
+        The cbits used are determined based on the positions of measure nodes in the DAGCircuit,
+        they are the union of the cbits of all measure nodes.
 
         Returns:
             cbits_used (set): The set of cbits used in the DAGCircuit.
         """
-        for node in self.nodes:
-            if hasattr(node, 'name') and node.name == 'measure':
-                self.cbits_used = set(node.pos.values())
+        measure_nodes = self.get_measure_nodes()
+        if measure_nodes:
+            self.cbits_used = set().union(*[node.pos.values() for node in measure_nodes])
         return self.cbits_used
 
     def update_num_instruction_nodes(self) -> int:
@@ -122,9 +233,9 @@ class DAGCircuit(MultiDiGraph):
         Returns:
             num_instruction_nodes (int): The number of instruction nodes in the DAGCircuit.
         """
-        if -1 not in self.nodes:
+        if -1 not in self._node:
             raise ValueError('-1 should be in DAGCircuit, please add it first')
-        if float('inf') not in self.nodes:
+        if float('inf') not in self._node:
             raise ValueError('float("inf") should be in DAGCircuit, please add it first')
         self.num_instruction_nodes = len(self.nodes) - 2
 
@@ -134,29 +245,70 @@ class DAGCircuit(MultiDiGraph):
         """
         Update and resort the labels of the nodes in the DAGCircuit.
 
-        This is only for convenience and does not affect the DAGCircuit itself.
+        This is only for convenience and does not affect the DAGCircuit itself, the nodes of the new DAGCircuit
+        are copies of the nodes of this one.
 
         Returns:
             new_dag (DAGCircuit): A new DAGCircuit with nodes' labels resorted.
         """
-        # Create a new DAGCircuit
-        new_dag = DAGCircuit()
-
-        # Get the sorted list of nodes
-        sorted_nodes_list = self.nodes_list()
-
-        # Iterate through the sorted nodes and update labels
+        # Iterate through the sorted nodes and copy them with the updated labels
+        new_nodes = {}
         i = 0
-        for node in sorted_nodes_list:
+        for node in self.nodes_list():
+            new_node = copy.copy(node)
+            new_node.pos = copy.copy(node.pos)
             if node.name != 'measure':
-                node.label = i
-                new_dag.add_instruction_node_end(node)
+                new_node.label = i
                 i += 1
-            else:
-                new_dag.add_instruction_node_end(node)
+            new_nodes[node] = new_node
+
+        # The label is part of the hash of a node, so the graph is rebuilt on the copies,
+        # keeping the order of the nodes and of their successors and predecessors
+        new_dag = DAGCircuit()
+        succ, pred = new_dag._succ, new_dag._pred
+        for node, attrs in self._node.items():
+            new_node = new_nodes.get(node, node)
+            new_dag._node[new_node] = attrs.copy()
+            succ[new_node] = {new_nodes.get(v, v): {key: data.copy() for key, data in keydict.items()}
+                              for v, keydict in self._succ[node].items()}
+        for node, nbrs in self._pred.items():
+            new_node = new_nodes.get(node, node)
+            pred[new_node] = {new_nodes.get(u, u): succ[new_nodes.get(u, u)][new_node] for u in nbrs}
+        new_dag.qubits_used = set(self.qubits_used)
+        new_dag.cbits_used = set(self.cbits_used)
+        new_dag.circuit_qubits = self.circuit_qubits
+        new_dag.num_instruction_nodes = self.num_instruction_nodes
 
         return new_dag
 
+    def topological_sort(self) -> list:
+        """
+        Return the nodes of the DAGCircuit in topological order.
+
+        Kahn's algorithm run directly on the adjacency dicts, giving the same order as nx.topological_sort
+        without its generic per-node degree views and generator layers. The order is kept until the graph changes.
+
+        Returns:
+            sorted_nodes (list): The nodes of the DAGCircuit in topological order.
+        """
+        if self._topological_order is not None:
+            return list(self._topological_order)
+
+        succ = self._succ
+        # The number of distinct predecessors, parallel edges are released together
+        indegree = {node: len(preds) for node, preds in self._pred.items()}
+        sorted_nodes = [node for node, degree in indegree.items() if degree == 0]
+        # sorted_nodes grows while it is iterated, which visits the nodes generation by generation
+        for node in sorted_nodes:
+            for child in succ[node]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    sorted_nodes.append(child)
+        if len(sorted_nodes) != len(indegree):
+            raise nx.NetworkXUnfeasible('Graph contains a cycle')
+        self._topological_order = sorted_nodes
+        return list(sorted_nodes)
+
     def nodes_dict(self) -> dict:
         """
         Return a dictionary of nodes with the node label as key and the node as value,
@@ -166,7 +318,7 @@ class DAGCircuit(MultiDiGraph):
             dict: A dictionary where keys are node labels and values are nodes.
         """
         nodes_dict = {}
-        for node in nx.topological_sort(self):
+        for node in self.topological_sort():
             if node != -1 and node != float('inf'):
                 nodes_dict[node.label] = node
         return nodes_dict
@@ -179,7 +331,7 @@ class DAGCircuit(MultiDiGraph):
             nodes_list (list): A list of nodes excluding -1 and float('inf').
         """
         nodes_list = []
-        for node in nx.topological_sort(self):
+        for node in self.topological_sort():
             if node != -1 and node != float('inf'):
                 nodes_list.append(node)
         return nodes_list
@@ -194,14 +346,14 @@ class DAGCircuit(MultiDiGraph):
         Returns:
             node_qubits_predecessors (dict): A dictionary where keys are qubits and values are predecessor nodes.
         """
-        if node not in self.nodes:
+        if node not in self._node:
             raise ValueError('Node should be in DAGCircuit')
         if node == -1:
             raise ValueError('-1 has no predecessors')
 
         node_qubits_predecessors = {
-            int(edge[2]['label'][1:]): edge[0]
-            for edge in self.in_edges(node, data=True)
+            data['qubit']: pred
+            for pred, keydict in self._pred[node].items() for data in keydict.values()
         }
 
         return node_qubits_predecessors
@@ -216,14 +368,14 @@ class DAGCircuit(MultiDiGraph):
         Returns:
             node_qubits_successors (dict): A dictionary where keys are qubits and values are successor nodes.
         """
-        if node not in self.nodes:
+        if node not in self._node:
             raise ValueError('Node should be in DAGCircuit')
         if node == float('inf'):
             raise ValueError('float("inf") has no successors')
 
         node_qubits_successors = {
-            int(edge[2]['label'][1:]): edge[1]
-            for edge in self.out_edges(node, data=True)
+            data['qubit']: succ
+            for succ, keydict in self._succ[node].items() for data in keydict.values()
         }
 
         return node_qubits_successors
@@ -238,14 +390,16 @@ class DAGCircuit(MultiDiGraph):
         Returns:
             dict: A dictionary where keys are qubits and values are incoming edges.
         """
-        if node not in self.nodes:
+        if node not in self._node:
             raise ValueError('Node should be in DAGCircuit')
         if node == -1:
             raise ValueError('-1 has no predecessors')
 
-        inedges = [edge for edge in self.in_edges(node, data=True, keys=True)]
-        qubits_labels = [int(edge[2]['label'][1:]) for edge in self.in_edges(node, data=True)]
-        node_qubits_inedges = dict(zip(qubits_labels, inedges))
+        # Same edges and order as self.in_edges(node, data=True, keys=True), read from the adjacency dicts
+        node_qubits_inedges = {
+            data['qubit']: (pred, node, key, data)
+            for pred, keydict in self._pred[node].items() for key, data in keydict.items()
+        }
         return node_qubits_inedges
 
     def node_qubits_outedges(self, node: InstructionNode) -> dict:
@@ -258,14 +412,16 @@ class DAGCircuit(MultiDiGraph):
         Returns:
             dict: A dictionary where keys are qubits and values are outgoing edges.
         """
-        if node not in self.nodes:
+        if node not in self._node:
             raise ValueError('Node should be in DAGCircuit')
         if node == float('inf'):
             raise ValueError('float("inf") has no successors')
 
-        outedges = [edge for edge in self.out_edges(node, data=True, keys=True)]
-        qubits_labels = [int(edge[2]['label'][1:]) for edge in self.out_edges(node, data=True)]
-        node_qubits_outedges = dict(zip(qubits_labels, outedges))
+        # Same edges and order as self.out_edges(node, data=True, keys=True), read from the adjacency dicts
+        node_qubits_outedges = {
+            data['qubit']: (node, succ, key, data)
+            for succ, keydict in self._succ[node].items() for key, data in keydict.items()
+        }
         return node_qubits_outedges
 
     def remove_instruction_node(self, gate: InstructionNode) -> None:
@@ -280,26 +436,25 @@ class DAGCircuit(MultiDiGraph):
         Raises:
             ValueError: If the gate is not in the DAGCircuit or is -1 or float('inf').
         """
-        if gate not in self.nodes:
+        if gate not in self._node:
             raise ValueError('Gate should be in DAGCircuit')
         if gate in {-1, float('inf')}:
             raise ValueError('Gate should not be -1 or float("inf")')
 
-        qubits_predecessors = self.node_qubits_predecessors(gate)
-        qubits_successors = self.node_qubits_successors(gate)
+        # The same dicts as node_qubits_predecessors(gate) and node_qubits_successors(gate), built in place
+        qubits_predecessors = {data['qubit']: pred
+                               for pred, keydict in self._pred[gate].items() for data in keydict.values()}
+        qubits_successors = {data['qubit']: succ
+                             for succ, keydict in self._succ[gate].items() for data in keydict.values()}
 
         for qubit in gate.pos:
             pred = qubits_predecessors[qubit]
             succ = qubits_successors[qubit]
-            if pred != -1 and succ != float('inf'):
-                self.add_edge(pred, succ, label=f'q{qubit}')
-            elif pred == -1 and succ != float('inf'):
-                self.add_edge(pred, succ, label=f'q{qubit}', color='green')
-            else:
-                self.add_edge(pred, succ, label=f'q{qubit}', color='red')
+            self.add_edge(pred, succ, label=qubit_label(qubit), qubit=qubit,
+                          **_EDGE_COLORS[pred == -1, succ == float('inf')])
 
+        # The qubits of the gate keep their edges from -1, so the qubits used do not change
         self.remove_node(gate)
-        self.update_qubits_used()
 
     def merge_dag(self, other_dag: 'DAGCircuit') -> 'DAGCircuit':
         """
@@ -337,17 +492,19 @@ class DAGCircuit(MultiDiGraph):
             for qubit in intersect_qubits:
                 self.remove_edges_from([end_edges_labels_1[qubit]])
                 other_dag.remove_edges_from([start_edges_labels_2[qubit]])
-                self.add_edge(end_edges_labels_1[qubit][0], start_edges_labels_2[qubit][1], label=f'q{qubit}')
+                self.add_edge(end_edges_labels_1[qubit][0], start_edges_labels_2[qubit][1],
+                              label=qubit_label(qubit), qubit=qubit)
 
-        # Add nodes and edges from the other DAG to this DAG
-        self.add_nodes_from(other_dag.nodes(data=True))
+        # Add nodes and edges from the other DAG to this DAG,
+        # the shared nodes (-1 and float('inf')) only have their attributes merged
+        self._add_nodes_in_bulk(other_dag._node.items())
         self.add_edges_from(other_dag.edges(data=True))
 
         # remove the edges between -1 and float('inf')
         # self.remove_edges_from([edge for edge in self.edges(keys=True) if edge[0] == -1 and edge[1] == float('inf')])
 
-        # Update qubits used in the merged DAG
-        self.update_qubits_used()
+        # Update qubits used in the merged DAG, the edges leaving -1 now cover the qubits of both DAGs
+        self.qubits_used = self_qubits_used | other_dag_qubits_used
 
     def add_instruction_node(self, gate: InstructionNode, predecessors_dict: Dict[int, InstructionNode],
                              successors_dict: Dict[int, InstructionNode]) -> None:
@@ -369,7 +526,6 @@ class DAGCircuit(MultiDiGraph):
         # Remove the edges between the predecessors and successors for the qubits used by the added node
         qubits_pre_out_edges = []
         qubits_suc_in_edges = []
-        self.update_qubits_used()
 
         for qubit in gate.pos:
             if qubit in self.qubits_used:
@@ -387,19 +543,12 @@ class DAGCircuit(MultiDiGraph):
         for qubit in gate.pos:
             pred = predecessors_dict[qubit]
             succ = successors_dict[qubit]
+            self.add_edge(pred, gate, label=qubit_label(qubit), qubit=qubit, **_EDGE_COLORS[pred == -1, False])
+            self.add_edge(gate, succ, label=qubit_label(qubit), qubit=qubit,
+                          **_EDGE_COLORS[False, succ == float('inf')])
 
-            if pred == -1:
-                self.add_edge(pred, gate, label=f'q{qubit}', color='green')
-            else:
-                self.add_edge(pred, gate, label=f'q{qubit}')
-
-            if succ == float('inf'):
-                self.add_edge(gate, succ, label=f'q{qubit}', color='red')
-            else:
-                self.add_edge(gate, succ, label=f'q{qubit}')
-
-        # Update qubits
-        self.update_qubits_used()
+        # Update qubits, all the qubits of the gate now have an edge from -1
+        self.qubits_used.update(gate.pos)
 
     def add_instruction_node_end(self, gate: InstructionNode):
         """
@@ -414,27 +563,50 @@ class DAGCircuit(MultiDiGraph):
         if gate in {-1, float('inf')}:
             raise ValueError('Gate should not be -1 or float("inf")')
 
-        if -1 not in self.nodes or float('inf') not in self.nodes:
+        if -1 not in self._node or float('inf') not in self._node:
             # If DAGCircuit is empty, add -1 and float('inf') first
             self.add_nodes_from([(-1, {"color": "green"}), (float('inf'), {"color": "red"})])
 
             # Add the new node and edges
             self.add_node(gate, color="blue")
             for qubit in gate.pos:
-                self.add_edge(-1, gate, label=f'q{qubit}', color='green')
-                self.add_edge(gate, float('inf'), label=f'q{qubit}', color='red')
-
-        elif -1 in self.nodes and float('inf') in self.nodes:
-            # Get the predecessors_dict of the new node
-            inf_predecessors_dict = self.node_qubits_predecessors(float('inf'))
-            gate_predecessors_dict = {qubit: inf_predecessors_dict.get(qubit, -1) for qubit in gate.pos}
-            gate_successors_dict = {qubit: float('inf') for qubit in gate.pos}
+                self.add_edge(-1, gate, label=qubit_label(qubit), qubit=qubit, color='green')
+                self.add_edge(gate, float('inf'), label=qubit_label(qubit), qubit=qubit, color='red')
+
+            qubits_last_nodes = {qubit: gate for qubit in gate.pos}
+            self.qubits_used.update(gate.pos)
+
+        elif -1 in self._node and float('inf') in self._node:
+            # Get the predecessors_dict of the new node, the last nodes on the qubits are kept between
+            # consecutive calls, so the in-edges of float('inf') are only scanned after other changes
+            qubits_last_nodes = self._qubits_last_nodes
+            if qubits_last_nodes is None:
+                qubits_last_nodes = self.node_qubits_predecessors(float('inf'))
+            gate_predecessors_dict = {qubit: qubits_last_nodes.get(qubit, -1) for qubit in gate.pos}
+
+            # Remove the edges between the predecessors and float('inf') for the qubits used by the added node
+            removed_edges = set()
+            for qubit, pred in gate_predecessors_dict.items():
+                if qubit in qubits_last_nodes:
+                    for key, data in self._succ[pred][float('inf')].items():
+                        if data['qubit'] == qubit:
+                            removed_edges.add((pred, float('inf'), key))
+            self.remove_edges_from(removed_edges)
+
+            # Add the new node and edges, as add_instruction_node does
+            self.add_node(gate, color="blue")
+            for qubit, pred in gate_predecessors_dict.items():
+                self.add_edge(pred, gate, label=qubit_label(qubit), qubit=qubit, **_EDGE_COLORS[pred == -1, False])
+                self.add_edge(gate, float('inf'), label=qubit_label(qubit), qubit=qubit, color='red')
 
-            # Add the new node and edges using add_instruction_node method
-            self.add_instruction_node(gate, gate_predecessors_dict, gate_successors_dict)
+            for qubit in gate.pos:
+                qubits_last_nodes[qubit] = gate
+            self.qubits_used.update(gate.pos)
         else:
             raise ValueError('DAGCircuit should have both -1 and float("inf") nodes at the same time')
 
+        self._qubits_last_nodes = qubits_last_nodes
+
     def substitute_node_with_dag(self, gate: InstructionNode, input_dag):
         """
         Substitute a node in the DAGCircuit with another DAGCircuit.
@@ -448,7 +620,7 @@ class DAGCircuit(MultiDiGraph):
                         input_dag is not a DAGCircuit, or the qubits set of input_dag
                         is not the same as the gate's qubits.
         """
-        if gate not in self.nodes:
+        if gate not in self._node:
             raise ValueError('node should be in DAGCircuit')
         if gate in {-1, float('inf')}:
             raise ValueError('node should not be -1 or float("inf")')
@@ -475,7 +647,7 @@ class DAGCircuit(MultiDiGraph):
         input_dag_startnodes = input_dag.node_qubits_successors(-1)
         input_dag_endnodes = input_dag.node_qubits_predecessors(float('inf'))
 
-        input_dag_qubits = input_dag.update_qubits_used()
+        input_dag_qubits = input_dag.qubits_used
 
         input_dag.remove_node(-1)
         input_dag.remove_node(float('inf'))
@@ -483,18 +655,19 @@ class DAGCircuit(MultiDiGraph):
         # Add edges between the nodes in input_dag and the predecessors and successors of the original node
         for qubit in input_dag_qubits:
             pred = predecessors_dict[qubit]
-            self.add_edge(
-                pred, input_dag_startnodes[qubit], label=f'q{qubit}', color='green' if pred == -1 else 'black')
+            self.add_edge(pred, input_dag_startnodes[qubit], label=qubit_label(qubit), qubit=qubit,
+                          color='green' if pred == -1 else 'black')
             succ = successors_dict[qubit]
-            self.add_edge(
-                input_dag_endnodes[qubit], succ, label=f'q{qubit}', color='red' if succ == float('inf') else 'black')
+            self.add_edge(input_dag_endnodes[qubit], succ, label=qubit_label(qubit), qubit=qubit,
+                          color='red' if succ == float('inf') else 'black')
 
-        # Add nodes and edges from input_dag to self
-        self.add_nodes_from(input_dag.nodes(data=True))
-        self.add_edges_from(input_dag.edges(data=True))
+        # Add nodes and edges from input_dag to self, the edges of input_dag are all between its own nodes,
+        # which are new to self, so they are added with the same keys as add_edges_from would give them
+        self._add_nodes_in_bulk(input_dag._node.items())
+        self._add_edges_in_bulk((u, v, data.copy()) for u, nbrs in input_dag._succ.items()
+                                for v, keydict in nbrs.items() for data in keydict.values())
 
-        # Update other attributes of the DAG
-        self.update_qubits_used()
+        # The qubits of input_dag are the ones of the gate, so the qubits used by the DAG do not change
 
     def is_dag(self) -> bool:
         """
@@ -503,7 +676,14 @@ class DAGCircuit(MultiDiGraph):
         Returns:
             bool: True if the DAGCircuit is a DAG, False otherwise.
         """
-        return nx.is_directed_acyclic_graph(self)
+        # A topological order only exists for a DAG, and it is cached until the graph changes
+        if self._topological_order is not None:
+            return True
+        try:
+            self.topological_sort()
+        except nx.NetworkXUnfeasible:
+            return False
+        return True
 
     def get_measure_nodes(self) -> list:
         """
@@ -512,7 +692,7 @@ class DAGCircuit(MultiDiGraph):
         Returns:
             list: A list of 'measure' nodes in the DAGCircuit.
         """
-        return [node for node in self.nodes if node not in {-1, float('inf')} and node.name == 'measure']
+        return [node for node in self._node if getattr(node, 'name', None) == 'measure']
 
     def remove_measure_nodes(self, only_last_measure: bool = False) -> None:
         """
@@ -18,7 +18,7 @@ import dataclasses
 from typing import Dict, Any, List, Union
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class InstructionNode:
     """
     A class representing a single instruction in a quantum circuit.
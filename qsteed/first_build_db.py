@@ -20,20 +20,29 @@ def build_db():
     database_operations(create=True)
 
 
-def create_tables():
+def create_tables(initializers=('qpu', 'stdqpu', 'subqpu', 'vqpu')):
+    """Create the empty tables and fill the given ones.
+
+    Args:
+        initializers (Iterable[str]): The tables to initialize, any of 'qpu', 'stdqpu', 'subqpu' and 'vqpu'.
+    """
+    initializers = set(initializers)
+    unknown = initializers - {'qpu', 'stdqpu', 'subqpu', 'vqpu'}
+    if unknown:
+        raise ValueError(f'Unknown initializers: {sorted(unknown)}')
+
     from qsteed.resourcemanager.database_sql.initialize_app_db import db, app
-    from qsteed.resourcemanager.database_sql.initialize_database import initialize_qpu, initialize_stdqpu, \
-        initialize_subqpu, initialize_vqpu
+    from qsteed.resourcemanager.database_sql import initialize_database
     with app.app_context():
         print("Creating all empty tables...")
         db.create_all()
         db.session.commit()
-        initialize_qpu()
-        initialize_stdqpu()
-        initialize_subqpu()
-        initialize_vqpu()
+        # In dependency order, the substructures are built from the QPUs
+        for name in ('qpu', 'stdqpu', 'subqpu', 'vqpu'):
+            if name in initializers:
+                getattr(initialize_database, f'initialize_{name}')()
 
 
-def first_build_db():
+def first_build_db(initializers=('qpu', 'stdqpu', 'subqpu', 'vqpu')):
     build_db()
-    create_tables()
+    create_tables(initializers)
@@ -18,6 +18,28 @@ import networkx as nx
 import numpy as np
 
 
+def wl_kernel_data(graph: nx.Graph):
+    """Extract what the W-L subtree kernel reads from a graph: the node weights (initial labels),
+    the weighted edges and the neighbors of each node.
+
+    The nodes are numbered 0, 1, ... in the order of the graph, so the kernel indexes lists
+    instead of looking up the node labels. A graph compared with many others (e.g. a circuit
+    against every VQPU) can be extracted once and passed to wl_subtree_kernel instead of the graph.
+
+    Args:
+        graph (nx.Graph): A graph with 'weight' attributes on its nodes and edges.
+
+    Returns:
+        (labels, edges, neighbors): The list of node labels, the list of (u, v, weight) edges
+                                    and the list of neighbor lists, by node index.
+    """
+    index = {node: i for i, node in enumerate(graph)}
+    labels = [data['weight'] for _, data in graph.nodes.data()]
+    edges = [(index[u], index[v], data['weight']) for u, v, data in graph.edges.data()]
+    neighbors = [[index[n] for n in nbrs] for nbrs in graph.adj.values()]
+    return labels, edges, neighbors
+
+
 def wl_subtree_kernel(g1: nx.Graph, g2: nx.Graph, iteration: int = 3):
     """Compute the Weisfeiler-Lehman Subtree Kernel between two graphs.
 
@@ -27,96 +49,74 @@ def wl_subtree_kernel(g1: nx.Graph, g2: nx.Graph, iteration: int = 3):
         Journal of Machine Learning Research 12, 2539–2561.
 
     Args:
-        g1 (nx.Graph):
-        g2 (nx.Graph):
+        g1 (nx.Graph): A graph, or its wl_kernel_data.
+        g2 (nx.Graph): A graph, or its wl_kernel_data.
         iteration (int): Maximum height for the subtree kernel computation.
 
     Returns:
         kernel_value: Subtree kernel similarity between g1 and g2.
     """
+    # The node labels of each iteration are kept in lists, g1 and g2 are not modified
+    labels1, edges1, neighbors1 = wl_kernel_data(g1) if isinstance(g1, nx.Graph) else g1
+    labels2, edges2, neighbors2 = wl_kernel_data(g2) if isinstance(g2, nx.Graph) else g2
     kernel_value = 0
     for i in range(iteration):
-        kernel_value = kernel_value + _subtree_kernel(g1, g2)
-        g1, g2 = _iteration_graph(g1, g2)
+        kernel_value = kernel_value + _subtree_kernel(edges1, edges2, labels1, labels2)
+        labels1, labels2 = _iteration_labels(neighbors1, neighbors2, labels1, labels2)
     return kernel_value
 
 
-def _subtree_kernel(g1: nx.Graph, g2: nx.Graph):
-    """Compute the Subtree Kernel between two graphs.
+def _subtree_kernel(edges1: list, edges2: list, labels1: list, labels2: list):
+    """Compute the Subtree Kernel between two graphs with the given node labels.
+
+    The edges of g2 are grouped by their sorted pair of end labels, so each edge of g1 only visits
+    the edges of g2 it matches, in the same order as a double loop over all the edge pairs.
     """
+    weights2 = {}
+    for u2, v2, weight2 in edges2:
+        from2 = labels2[u2]
+        to2 = labels2[v2]
+        if from2 > to2:
+            from2, to2 = to2, from2
+        weights2.setdefault((from2, to2), []).append(weight2)
+    weights2 = {key: np.array(weights, dtype=float) for key, weights in weights2.items()}
+
     value = 0
-    for items1 in g1.edges.data():
-        from1 = g1.nodes[items1[0]]['weight']
-        to1 = g1.nodes[items1[1]]['weight']
+    for u1, v1, weight1 in edges1:
+        from1 = labels1[u1]
+        to1 = labels1[v1]
         if from1 > to1:
-            mid = from1
-            from1 = to1
-            to1 = mid
-        weight1 = items1[2]['weight']
-        for items2 in g2.edges.data():
-            from2 = g2.nodes[items2[0]]['weight']
-            to2 = g2.nodes[items2[1]]['weight']
-            if from2 > to2:
-                mid = from2
-                from2 = to2
-                to2 = mid
-            weight2 = items2[2]['weight']
-            if from1 == from2 and to1 == to2:
-                value = value + 1 / np.exp((weight1 - weight2) ** 2)
+            from1, to1 = to1, from1
+        matched_weights = weights2.get((from1, to1))
+        if matched_weights is not None:
+            # Summed one by one, in order, as the terms were before
+            for term in 1 / np.exp((weight1 - matched_weights) ** 2):
+                value = value + term
     return value
 
 
-def _iteration_graph(g1: nx.Graph, g2: nx.Graph):
-    """Iteratively generate subtree graph.
+def _iteration_labels(neighbors1: list, neighbors2: list, labels1: list, labels2: list):
+    """Iteratively generate the node labels of the subtree graphs.
     """
     num = 0
     dic = {}
-    res1 = {}
-    res2 = {}
-    for items1 in g1.nodes.data():
-        weight1 = items1[1]['weight']
-        for items2 in g2.nodes.data():
-            weight2 = items2[1]['weight']
-            if weight1 > num:
-                num = weight1
-            if weight2 > num:
-                num = weight2
+    if labels1 and labels2:
+        num = max(0, max(labels1), max(labels2))
     num = num + 1
-    for items1 in g1.nodes.data():
-        key = str(items1[1]['weight']) + ","
-        rellist = []
-        neilist = [n for n in g1.neighbors(items1[0])]
-        for i in neilist:
-            rellist.append(g1.nodes[i]['weight'])
-        rellist.sort()
-        for i in rellist:
-            key = key + str(i)
-        if key not in dic.keys():
-            dic[key] = num
-            res1[items1[0]] = num
-            num = num + 1
-        else:
-            res1[items1[0]] = dic[key]
-    for items2 in g2.nodes.data():
-        key = str(items2[1]['weight']) + ","
-        rellist = []
-        neilist = [n for n in g2.neighbors(items2[0])]
-        for i in neilist:
-            rellist.append(g2.nodes[i]['weight'])
-        rellist.sort()
-        for i in rellist:
-            key = key + str(i)
-        if key not in dic.keys():
-            dic[key] = num
-            res2[items2[0]] = num
-            num = num + 1
-        else:
-            res2[items2[0]] = dic[key]
-    for keys in res1.keys():
-        g1.add_node(keys, weight=res1[keys])
-    for keys in res2.keys():
-        g2.add_node(keys, weight=res2[keys])
-    return g1, g2
+    new_labels = []
+    for neighbors, labels in ((neighbors1, labels1), (neighbors2, labels2)):
+        res = []
+        for weight, nbrs in zip(labels, neighbors):
+            # The label and the sorted labels of the neighbors, as one string
+            key = str(weight) + "," + "".join([str(i) for i in sorted([labels[n] for n in nbrs])])
+            if key not in dic:
+                dic[key] = num
+                res.append(num)
+                num = num + 1
+            else:
+                res.append(dic[key])
+        new_labels.append(res)
+    return new_labels[0], new_labels[1]
 
 
 def fast_subtree_kernel(g1, g2, iteration: int = 3):
@@ -14,13 +14,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import copy
+from operator import itemgetter
 
 import networkx as nx
 from quafu import QuantumCircuit
 
 from qsteed.graph.circuitgraph import circuit_to_graph, relabel_graph
-from qsteed.graph.graphkernel import wl_subtree_kernel, fast_subtree_kernel, wl_oa_kernel
+from qsteed.graph.graphkernel import wl_subtree_kernel, wl_kernel_data, fast_subtree_kernel, wl_oa_kernel
 from qsteed.compiler.qasm_parser import qreg_creg
 
 
@@ -40,36 +40,41 @@ def similar_structure(circuit: str, vqpus: list):
     qc.from_openqasm(circuit)
     qc.draw_circuit()
     g1 = circuit_to_graph(qc)
+    # The circuit graph is the same for every VQPU, extract it for the kernel once
+    g1_data = wl_kernel_data(g1)
     similar_structure_list = []
-    kernel_value_list = []
+    kernel_value_set = set()
+    # VQPUs with the same coupling list (couplings are relabeled to virtual qubits) get the same kernel value,
+    # which is then already in kernel_value_set, so only the first of them is compared
+    seen_coupling_lists = set()
     for vqpu in vqpus:
+        coupling_key = tuple(tuple(item) for item in vqpu.coupling_list)
+        if coupling_key in seen_coupling_lists:
+            continue
+        seen_coupling_lists.add(coupling_key)
+
         g2 = nx.Graph()
-        g1_copy = copy.deepcopy(g1)
-        for item in vqpu.coupling_list:
-            g2.add_edges_from([(item[0], item[1], {'weight': item[2]})])
+        g2.add_weighted_edges_from((item[0], item[1], item[2]) for item in vqpu.coupling_list)
         g2 = relabel_graph(g2)
 
         # W-L subtree kernel iteration
-        kernel_value = wl_subtree_kernel(g1_copy, g2, iteration=10)
-        if round(kernel_value, 1) not in kernel_value_list:
-            kernel_value_list.append(round(kernel_value, 1))
+        kernel_value = wl_subtree_kernel(g1_data, g2, iteration=10)
+        if round(kernel_value, 1) not in kernel_value_set:
+            kernel_value_set.add(round(kernel_value, 1))
             similar_structure_list.append((vqpu, kernel_value))
 
         # # Weisfeiler-Lehman Optimal Assignment (WL-OA) Kernel iteration
-        # kernel_value = wl_oa_kernel(g1_copy, g2, iteration=10)
-        # if round(kernel_value, 1) not in kernel_value_list:
-        #     kernel_value_list.append(round(kernel_value, 1))
+        # kernel_value = wl_oa_kernel(g1, g2, iteration=10)
+        # if round(kernel_value, 1) not in kernel_value_set:
+        #     kernel_value_set.add(round(kernel_value, 1))
         #     similar_structure_list.append((vqpu, kernel_value))
 
         # # fast subtree kernel iteration
         # g2 = nx.convert_node_labels_to_integers(g2)
-        # kernel_value = fast_subtree_kernel(g1_copy, g2, iteration=10)
-        # if round(kernel_value, 1) not in kernel_value_list:
-        #     kernel_value_list.append(round(kernel_value, 1))
+        # kernel_value = fast_subtree_kernel(g1, g2, iteration=10)
+        # if round(kernel_value, 1) not in kernel_value_set:
+        #     kernel_value_set.add(round(kernel_value, 1))
         #     similar_structure_list.append((vqpu, kernel_value))
 
-        g1_copy.clear()
-        g2.clear()
-
-    similar_structure_list = sorted(similar_structure_list, key=lambda x: x[1], reverse=True)
+    similar_structure_list = sorted(similar_structure_list, key=itemgetter(1), reverse=True)
     return similar_structure_list
@@ -16,6 +16,9 @@
 
 import multiprocessing
 import os
+import pickle
+import sys
+from multiprocessing.pool import ThreadPool
 
 import dill
 
@@ -24,6 +27,88 @@ from qsteed.passflow.passflow import PassFlow
 from qsteed.transpiler.transpiler import Transpiler
 
 
+def default_num_processes(num_tasks: int) -> int:
+    """Half of the CPU cores (half full load), at least one and no more than the number of tasks."""
+    half_cpu_count = max(1, (os.cpu_count() or 1) // 2)
+    return max(1, min(num_tasks, half_cpu_count))
+
+
+def create_pool(num_tasks: int, num_processes: int = None):
+    """
+    Create a worker pool for num_tasks tasks.
+
+    On Windows, where new processes are spawned and have to re-import qsteed (and reconnect the database),
+    a thread pool with the same interface is returned instead of a process pool.
+
+    Args:
+        num_tasks (int): Number of tasks that will be submitted to the pool.
+        num_processes (int): Number of workers, defaults to `default_num_processes(num_tasks)`.
+
+    Returns:
+        multiprocessing.pool.Pool or multiprocessing.pool.ThreadPool
+    """
+    if num_processes is None:
+        num_processes = default_num_processes(num_tasks)
+    if sys.platform == 'win32':
+        return ThreadPool(num_processes)
+    return multiprocessing.Pool(num_processes)
+
+
+def _dumps(obj):
+    """
+    Serialize obj with pickle, which is much faster than dill, and fall back to dill for what pickle rejects
+    (e.g. circuits with parameterized gates, which hold local functions).
+
+    Returns:
+        (bool, bytes): Whether dill was used, and the serialized obj.
+    """
+    try:
+        return False, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    except pickle.PicklingError:
+        pass
+    except (TypeError, AttributeError) as error:
+        # pickle rejects e.g. local functions with these messages, anything else raised while reducing obj is a bug
+        if not str(error).lower().startswith(("can't pickle", "cannot pickle")):
+            raise
+    return True, dill.dumps(obj)
+
+
+def _loads(serialized):
+    """Deserialize an object serialized by `_dumps`."""
+    use_dill, data = serialized
+    return dill.loads(data) if use_dill else pickle.loads(data)
+
+
+# Serialized passflow and model shared by all tasks of a worker, set by `_init_worker`.
+_worker_shared = {}
+
+
+def _init_worker(serialized_passflow, serialized_model):
+    _worker_shared['passflow'] = serialized_passflow
+    _worker_shared['model'] = serialized_model
+
+
+def _process_shared_circuit(indexed_circuit):
+    # Passes and models keep state (e.g. layouts) between runs, so each task gets its own copy.
+    index, serialized_circuit = indexed_circuit
+    passflow = _loads(_worker_shared['passflow'])
+    model = _loads(_worker_shared['model'])
+    return index, _process_circuit(serialized_circuit, passflow, model)
+
+
+def _process_indexed_circuit(indexed_task):
+    index, (serialized_circuit, passflow, model) = indexed_task
+    return index, _process_circuit(serialized_circuit, passflow, model)
+
+
+def _collect_results(indexed_results, num_circuits):
+    """Deserialize the compiled circuits as they complete, and put them back in the order of the input circuits."""
+    compiled_circuits = [None] * num_circuits
+    for index, qc in indexed_results:
+        compiled_circuits[index] = _loads(qc)
+    return compiled_circuits
+
+
 def process_circuit(serialized_circuit, passflow, model):
     circuit = dill.loads(serialized_circuit)
     transpiler = Transpiler(passflow, model)
@@ -32,7 +117,29 @@ def process_circuit(serialized_circuit, passflow, model):
     return serialized_compiled_circuit
 
 
+def _process_circuit(serialized_circuit, passflow, model):
+    """Same as `process_circuit`, with the circuits serialized by `_dumps`."""
+    circuit = _loads(serialized_circuit)
+    transpiler = Transpiler(passflow, model)
+    compiled_circuit = transpiler.transpile(circuit)
+    return _dumps(compiled_circuit)
+
+
 def parallel_process_circuits(circuits, passflows, models, num_processes=None):
+    serialized_circuits = [_dumps(circuit) for circuit in circuits]
+
+    if num_processes is None:
+        num_processes = default_num_processes(len(circuits))
+    # Small chunks keep all workers busy when the circuits take very different times to compile
+    chunksize = max(1, len(circuits) // (4 * num_processes))
+
+    if isinstance(passflows, PassFlow) and isinstance(models, Model):
+        # A single passflow and model are sent once to each worker instead of once per circuit.
+        with multiprocessing.Pool(num_processes, initializer=_init_worker,
+                                  initargs=(_dumps(passflows), _dumps(models))) as pool:
+            results = pool.imap_unordered(_process_shared_circuit, enumerate(serialized_circuits), chunksize)
+            return _collect_results(results, len(circuits))
+
     if isinstance(passflows, list):
         if len(passflows) != len(circuits):
             raise ValueError("The length of circuits and passflows are not equal.")
@@ -51,23 +158,8 @@ def parallel_process_circuits(circuits, passflows, models, num_processes=None):
         raise ValueError(
             "Please enter the correct models data type, a single model or a list of multiple models.")
 
-    serialized_circuits = [dill.dumps(circuit) for circuit in circuits]
-
     picked = zip(serialized_circuits, passflows, models)
 
-    if num_processes is None:
-        cpu_count = os.cpu_count()
-        half_cpu_count = int(cpu_count / 2)  # Half full load
-        if len(circuits) > half_cpu_count:
-            num_processes = half_cpu_count
-        else:
-            num_processes = len(circuits)
-
     with multiprocessing.Pool(num_processes) as pool:
-        results = pool.starmap(process_circuit, [(circuit, passflow, model) for circuit, passflow, model in picked])
-
-    compiled_circuits = []
-    for qc in results:
-        compiled_circuit = dill.loads(qc)
-        compiled_circuits.append(compiled_circuit)
-    return compiled_circuits
+        results = pool.imap_unordered(_process_indexed_circuit, enumerate(picked), chunksize)
+        return _collect_results(results, len(circuits))
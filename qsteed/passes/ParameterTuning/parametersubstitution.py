@@ -19,7 +19,6 @@ from quafu.elements.parameters import Parameter, ParameterExpression
 from qsteed.dag.circuit_dag_convert import dag_to_circuit
 from qsteed.dag.dagcircuit import DAGCircuit
 from qsteed.passes.basepass import BasePass
-from functools import lru_cache
 
 
 class ParaSubstitution(BasePass):
@@ -32,6 +31,10 @@ class ParaSubstitution(BasePass):
 
         self.para_list = []
         self.para_dict = dict()
+        # The para_list para_dict was built from, para_dict is only rebuilt when para_list is replaced
+        self._para_dict_list = None
+        # {id(para): updated para}, only valid for the parameters of the current run
+        self._para_cache = {}
 
     def set_model(self, model):
         """
@@ -39,6 +42,8 @@ class ParaSubstitution(BasePass):
         here we only need the parameters in the model
         """
         self.para_list = model.get_datadict()['variables']
+        self._para_dict_list = None  # Invalidate para_dict
+        self._para_cache.clear()
 
     def run(self, circuit):
         """
@@ -56,11 +61,10 @@ class ParaSubstitution(BasePass):
         if isinstance(circuit, DAGCircuit):
             circuit = dag_to_circuit(circuit, circuit.circuit_qubits)
 
-        para_dict = dict()
-        for para in self.para_list:
-            para_dict[f'{para.name}'] = para
-
-        self.para_dict = para_dict
+        if self._para_dict_list is not self.para_list:
+            self.para_dict = {para.name: para for para in self.para_list}
+            self._para_dict_list = self.para_list
+        self._para_cache.clear()
 
         # update the global variables in the circuit
         self.update_global_variables(circuit)
@@ -96,26 +100,30 @@ class ParaSubstitution(BasePass):
                 gate.paras[i] = self.update_para_variables(para)
         return gate
 
-    @lru_cache(maxsize=128)
     def update_para_variables(self, para):
         """
         Update the parameters in the Parameter or ParameterExpression variable.
         """
+        para_id = id(para)
+        if para_id in self._para_cache:
+            return self._para_cache[para_id]
+
         if isinstance(para, Parameter):
-            para = self.para_dict[f'{para.name}']
-            return para
+            updated_para = self.para_dict[para.name]
 
         elif isinstance(para, ParameterExpression):
             para.pivot = self.update_para_variables(para.pivot)
             for i, operand in enumerate(para.operands):
                 if isinstance(operand, (Parameter, ParameterExpression)):
                     para.operands[i] = self.update_para_variables(operand)
-
-            return para
+            updated_para = para
 
         else:
             return para
 
+        self._para_cache[para_id] = updated_para
+        return updated_para
+
 
 class ParaSubstitutionCached(BasePass):
     """
@@ -154,7 +162,7 @@ class ParaSubstitutionCached(BasePass):
             circuit = dag_to_circuit(circuit, circuit.circuit_qubits)
 
         if self._para_dict_cache is None:
-            para_dict = {f'{para.name}': para for para in self.para_list}
+            para_dict = {para.name: para for para in self.para_list}
             self.para_dict = para_dict
             self._para_dict_cache = para_dict
         else:
@@ -201,7 +209,7 @@ class ParaSubstitutionCached(BasePass):
         Update the parameters in the Parameter or ParameterExpression variable.
         """
         if isinstance(para, Parameter):
-            para = self.para_dict[f'{para.name}']
+            para = self.para_dict[para.name]
             return para
 
         elif isinstance(para, ParameterExpression):
@@ -18,6 +18,9 @@ import numpy as np
 
 from qsteed.passes.decomposition.utils import matrix_utils as mu
 
+# Check every decomposition against the input matrix, each check multiplies the factors back together
+_CHECK_CSD = False
+
 
 def thinCSD(q1, q2):
     p = q1.shape[0]
@@ -27,8 +30,7 @@ def thinCSD(q1, q2):
     v1d = np.conjugate(v1).T
     c = np.flip(c)
 
-    cm = np.zeros((p, p), dtype=complex)
-    np.fill_diagonal(cm, c)
+    cm = np.diag(c).astype(complex)
 
     u1 = np.fliplr(u1)
     v1d = np.fliplr(v1d)
@@ -36,10 +38,8 @@ def thinCSD(q1, q2):
     q2 = q2 @ v1d
 
     # find the biggest index of c[k] <= 1/np.sqrt(2)
-    k = 0
-    for i in range(1, p):
-        if c[i] <= 1 / np.sqrt(2):
-            k = i
+    small_indices = np.flatnonzero(c[1:] <= 1 / np.sqrt(2))
+    k = small_indices[-1] + 1 if small_indices.size else 0
 
     k = k + 1
     # print("the k size: {}".format(k))
@@ -67,13 +67,13 @@ def thinCSD(q1, q2):
         cm[k:p, k:p] = r
         u1[:, k:p] = u1[:, k:p] @ z
 
-    for i in range(p):
-        if np.real(cm[i, i]) < 0:
-            cm[i, i] = -cm[i, i]
-            u1[:, i] = -u1[:, i]
-        if np.real(s[i, i]) < 0:
-            s[i, i] = -s[i, i]
-            u2[:, i] = -u2[:, i]
+    # Make the diagonals of cm and s non-negative, flipping the matching columns of u1 and u2
+    negative = np.flatnonzero(np.real(np.diag(cm)) < 0)
+    cm[negative, negative] = -cm[negative, negative]
+    u1[:, negative] = -u1[:, negative]
+    negative = np.flatnonzero(np.real(np.diag(s)) < 0)
+    s[negative, negative] = -s[negative, negative]
+    u2[:, negative] = -u2[:, negative]
 
     return u1, u2, v1d, cm, s
 
@@ -91,27 +91,29 @@ def fatCSD(matrix):
     ss = -ss
 
     # get the v2
+    # Each row of v2 is taken from the larger of s and c, so the division is well conditioned
     R1 = np.zeros_like(R0)
-    p = R1.shape[0]
-    for j in range(p):
-        if np.abs(ss[j, j]) > np.abs(cc[j, j]):
-            L0d = np.conjugate(L0).T
-            tmp = L0d @ U01
-            R1[j, :] = tmp[j, :] / ss[j, j]
-        else:
-            L1d = np.conjugate(L1).T
-            tmp = L1d @ U11
-            R1[j, :] = tmp[j, :] / cc[j, j]
-
-    assert mu.is_approx(L0 @ cc @ R0, U00)
-    assert mu.is_approx(-L1 @ ss @ R0, U10)
-    assert mu.is_approx(L0 @ ss @ R1, U01)
-    assert mu.is_approx(L1 @ cc @ R1, U11)
-
-    zeros_m = np.zeros_like(L0)
-    L = mu.stack_matrices(L0, zeros_m, zeros_m, L1)
-    D = mu.stack_matrices(cc, ss, -ss, cc)
-    R = mu.stack_matrices(R0, zeros_m, zeros_m, R1)
-    assert mu.is_approx(matrix, L @ D @ R)
+    ss_diag = np.diag(ss)
+    cc_diag = np.diag(cc)
+    rows_s = np.abs(ss_diag) > np.abs(cc_diag)
+    rows_c = ~rows_s
+    if rows_s.any():
+        tmp = np.conjugate(L0).T @ U01
+        R1[rows_s, :] = tmp[rows_s, :] / ss_diag[rows_s, np.newaxis]
+    if rows_c.any():
+        tmp = np.conjugate(L1).T @ U11
+        R1[rows_c, :] = tmp[rows_c, :] / cc_diag[rows_c, np.newaxis]
+
+    if _CHECK_CSD:
+        assert mu.is_approx(L0 @ cc @ R0, U00)
+        assert mu.is_approx(-L1 @ ss @ R0, U10)
+        assert mu.is_approx(L0 @ ss @ R1, U01)
+        assert mu.is_approx(L1 @ cc @ R1, U11)
+
+        zeros_m = np.zeros_like(L0)
+        L = mu.stack_matrices(L0, zeros_m, zeros_m, L1)
+        D = mu.stack_matrices(cc, ss, -ss, cc)
+        R = mu.stack_matrices(R0, zeros_m, zeros_m, R1)
+        assert mu.is_approx(matrix, L @ D @ R)
 
     return L0, L1, R0, R1, cc, ss  # L0, L1 is unitary
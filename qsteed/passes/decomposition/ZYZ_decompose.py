@@ -44,6 +44,28 @@ def zyz_decomposition(unitary):
     return gamma, beta, alpha, global_phase
 
 
+def zyz_decomposition_batch(unitaries):
+    """ZYZ decomposition of a stack of single-qubit gates, vectorized over the first axis.
+    unitaries[k] = e^{i*global_phase[k]} @ Rz(gamma[k]) @ Ry(beta[k]) @ Rz(alpha[k])
+
+    Args:
+        unitaries (np.array): array of shape (N, 2, 2)
+    Returns:
+        gamma, beta, alpha, global_phase (np.array): arrays of shape (N,), same as `zyz_decomposition` element-wise
+    """
+    unitaries = np.asarray(unitaries, dtype=complex)
+    if unitaries.ndim != 3 or unitaries.shape[1:] != (2, 2):
+        raise Exception("ZYZ decomposition only applies to single-qubit gate.")
+    det = unitaries[:, 0, 0] * unitaries[:, 1, 1] - unitaries[:, 0, 1] * unitaries[:, 1, 0]
+    coefficient = det ** (-0.5)
+    global_phase = -np.angle(coefficient)
+    special_unitaries = coefficient[:, None, None] * unitaries
+    beta = 2 * np.arctan2(np.abs(special_unitaries[:, 1, 0]), np.abs(special_unitaries[:, 0, 0]))
+    t1 = np.angle(special_unitaries[:, 1, 1])
+    t2 = np.angle(special_unitaries[:, 1, 0])
+    return t1 - t2, beta, t1 + t2, global_phase
+
+
 def zxz_decomposition(unitary):
     """ZXZ decomposition of arbitrary single-qubit gate (unitary).
     unitary = e^{i*global_phase} @ Rz(gamma) @ Rx(beta) @ Rz(alpha)
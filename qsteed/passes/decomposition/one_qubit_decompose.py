@@ -19,6 +19,7 @@ import math
 
 import numpy as np
 
+from qsteed.passes.decomposition.ZYZ_decompose import zyz_decomposition_batch
 from qsteed.passes.decomposition.utils.matrix_utils import get_global_phase
 
 
@@ -127,3 +128,24 @@ class OneQubitDecompose:
             return self.xzx_decomposition(unitary)
         else:
             raise ValueError("The selected decomposition method can only be: ZYZ, ZXZ, XYX, XZX")
+
+    def run_batch(self, unitaries):
+        """Decompose a stack of single-qubit gates at once, equivalent to calling `run` on each of them.
+
+        Args:
+            unitaries (np.array): array of shape (N, 2, 2)
+        Returns:
+            gamma, beta, alpha, global_phase (np.array): rotation angles and global phases of shape (N,)
+        """
+        if self.method not in ('ZYZ', 'ZXZ', 'XYX', 'XZX'):
+            raise ValueError("The selected decomposition method can only be: ZYZ, ZXZ, XYX, XZX")
+        unitaries = np.asarray(unitaries, dtype=complex)
+        if self.method[0] == 'X':
+            hadamard = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+            unitaries = hadamard @ unitaries @ hadamard
+        gamma, beta, alpha, global_phase = zyz_decomposition_batch(unitaries)
+        if self.method in ('ZXZ', 'XZX'):
+            gamma, alpha = gamma - np.pi / 2, alpha + np.pi / 2
+        elif self.method == 'XYX':
+            beta = -beta
+        return gamma, beta, alpha, global_phase
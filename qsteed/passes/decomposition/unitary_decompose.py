@@ -56,10 +56,16 @@ class UnitaryDecompose(object):
         self.gates_list = []
         self.quafuQC = QuantumCircuit(self.nqubit)
         self.global_phase = 0
+        # Single-qubit blocks are collected during the recursion and decomposed together in one batch.
+        # `_operations` keeps the circuit order: ('U', qubits, block index), ('RZ'/'RY', [target], theta),
+        # ('CX', [control, target], None).
+        self._one_qubit_blocks = []
+        self._operations = []
 
     def decompose(self):
         _matrix = self.array
         self._decompose_matrix(_matrix, self.qubits)
+        self._build_circuit()
         self.quafuQC.measure(self.qubits, self.qubits)
         # print("Done decomposing")
 
@@ -72,10 +78,8 @@ class UnitaryDecompose(object):
 
         if num_qubit == 1:
             # self.gates_list.append((_matrix, qubits, 'U'))
-            one_qubit_decomposer = OneQubitDecompose(method=self.one_qubit_decompose)
-            gamma, beta, alpha, global_phase = one_qubit_decomposer.run(_matrix)
-            self.global_phase += global_phase
-            self.one_qubit_circuit(gamma, beta, alpha, qubits)
+            self._operations.append(('U', qubits, len(self._one_qubit_blocks)))
+            self._one_qubit_blocks.append(_matrix)
             # if self.one_qubit_decompose == 'ZYZ':
             #     # # ZYZ decomposition for single-qubit gate
             #     # gamma, beta, alpha, global_phase = zyz_decomposition(_matrix)
@@ -156,6 +160,28 @@ class UnitaryDecompose(object):
                 self.multi_controlled_z(D, qubits[1:], qubits[0])
                 self._decompose_matrix(V, qubits[1:])
 
+    def _build_circuit(self):
+        """Decompose the collected single-qubit blocks in one batch and emit all gates in circuit order."""
+        if self._one_qubit_blocks:
+            one_qubit_decomposer = OneQubitDecompose(method=self.one_qubit_decompose)
+            gammas, betas, alphas, global_phases = one_qubit_decomposer.run_batch(np.array(self._one_qubit_blocks))
+            self.global_phase += float(np.sum(global_phases))
+
+        for name, qubits, param in self._operations:
+            if name == 'U':
+                self.one_qubit_circuit(float(gammas[param]), float(betas[param]), float(alphas[param]), qubits)
+            elif name == 'RZ':
+                self.gates_list.append((rz_mat(param), qubits, 'RZ', param))
+                self.quafuQC.rz(qubits[0], param)
+            elif name == 'RY':
+                self.gates_list.append((ry_mat(param), qubits, 'RY', param))
+                self.quafuQC.ry(qubits[0], param)
+            else:
+                self.gates_list.append((CXMatrix, qubits, 'CX'))
+                self.quafuQC.cnot(qubits[0], qubits[1])
+        self._one_qubit_blocks = []
+        self._operations = []
+
     def multi_controlled_z(self, D, qubits, target_qubit):
         assert len(qubits) == int(math.log(D.shape[0], 2))
         num_qubit = len(qubits)
@@ -175,10 +201,8 @@ class UnitaryDecompose(object):
 
         for i in range(len(index)):
             control_qubit = qubits[index[i]]
-            self.gates_list.append((rz_mat(thetas[i]), [target_qubit], 'RZ', thetas[i]))
-            self.quafuQC.rz(target_qubit, thetas[i])
-            self.gates_list.append((CXMatrix, [control_qubit, target_qubit], 'CX'))
-            self.quafuQC.cnot(control_qubit, target_qubit)
+            self._operations.append(('RZ', [target_qubit], thetas[i]))
+            self._operations.append(('CX', [control_qubit, target_qubit], None))
 
     def multi_controlled_y(self, ss, qubits, target_qubit):
         assert len(qubits) == int(math.log(ss.shape[0], 2))
@@ -196,10 +220,8 @@ class UnitaryDecompose(object):
 
         for i in range(len(index)):
             control_qubit = qubits[index[i]]
-            self.gates_list.append((ry_mat(thetas[i]), [target_qubit], 'RY', thetas[i]))
-            self.quafuQC.ry(target_qubit, thetas[i])
-            self.gates_list.append((CXMatrix, [control_qubit, target_qubit], 'CX'))
-            self.quafuQC.cnot(control_qubit, target_qubit)
+            self._operations.append(('RY', [target_qubit], thetas[i]))
+            self._operations.append(('CX', [control_qubit, target_qubit], None))
 
     def one_qubit_circuit(self, gamma, beta, alpha, qubits):
         if self.one_qubit_decompose == 'ZYZ':
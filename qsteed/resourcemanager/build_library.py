@@ -15,13 +15,13 @@
 # limitations under the License.
 
 
-import copy
+import heapq
+import itertools
 import json
 import math
 import os
 import re
 from collections import defaultdict
-from queue import PriorityQueue
 
 import networkx as nx
 
@@ -92,13 +92,10 @@ class BuildLibrary:
         weighted_edges = list(d.values())
         G = nx.Graph()
         G.add_weighted_edges_from(weighted_edges)
-        G0 = copy.deepcopy(G)
-        connected_substructure_list = []
-        while len(G.nodes()) > 0:
-            connected_nodes = max(nx.connected_components(G), key=len)
-            connected_subgraph = G0.subgraph(connected_nodes)
-            connected_substructure_list.append(connected_subgraph)
-            G.remove_nodes_from(connected_nodes)
+        # The components are disjoint, so they are taken from G at once, the largest first
+        # (the sort is stable, components of the same size keep their order)
+        components = sorted(nx.connected_components(G), key=len, reverse=True)
+        connected_substructure_list = [G.subgraph(connected_nodes).copy() for connected_nodes in components]
         return connected_substructure_list
 
     def substructure(self, structure, connected_substructure_list, qubits_need):
@@ -112,6 +109,10 @@ class BuildLibrary:
         """
         if structure[0][2] > 1:
             structure = [[item[0], item[1], item[2] / 100] for item in structure]
+        # Positions of the edges in structure by their pair of qubits, to collect the edges inside a substructure
+        edge_index = defaultdict(list)
+        for i, edge in enumerate(structure):
+            edge_index[frozenset(edge[:2])].append(i)
         fidelity_threshold_fixed = self.fidelity_threshold
         all_substructure = []
         has_zero_fidelity = False
@@ -121,42 +122,47 @@ class BuildLibrary:
                 available_connected_substructure_list.append(cg)
 
         if available_connected_substructure_list:
+            # The (neighbor, weight) pairs of each node, read once from the graphs for the expansions below
+            adjacency_list = [{node: [(neighbor, data['weight']) for neighbor, data in nbrs.items()]
+                               for node, nbrs in cg.adj.items()} for cg in available_connected_substructure_list]
             while len(all_substructure) == 0:
-                for cg in available_connected_substructure_list:
+                for cg, adjacency in zip(available_connected_substructure_list, adjacency_list):
                     # if len(cg.nodes()) >= qubits_need:
                     substructure_nodes = []  #
                     fidelity_threshold = fidelity_threshold_fixed  #
                     sorted_edges = sorted(cg.edges(data=True), key=lambda x: x[2]['weight'], reverse=True)
                     for elem in sorted_edges:
                         if elem[2]['weight'] > fidelity_threshold:
-                            neighbors = PriorityQueue()
-                            neighbors.put((-1, elem[0]))
+                            # Heap of (-weight, node), the node reached by the largest weight first
+                            neighbors = [(-1, elem[0])]
                             ret_nodes = []
                             log_weight_product = 0
-                            for node in cg.nodes():
-                                cg.nodes[node]['visited'] = False
-                            while neighbors.not_empty:
-                                temp = neighbors.get()
+                            visited = set()
+                            while neighbors:
+                                temp = heapq.heappop(neighbors)
                                 node = temp[1]
-                                if cg.nodes[node]['visited']:
+                                if node in visited:
                                     continue
                                 weight = -temp[0]
                                 if weight <= 0:
                                     has_zero_fidelity = True
                                     weight = 1e-10
                                 log_weight_product += math.log(weight)
-                                cg.nodes[node]['visited'] = True
+                                visited.add(node)
                                 ret_nodes.append(node)
                                 if len(ret_nodes) == qubits_need:
                                     break
-                                for neighbor in cg[node]:
-                                    if not cg.nodes[neighbor]['visited']:
-                                        weight = cg[node][neighbor]['weight']
-                                        neighbors.put((-weight, neighbor))
-                            out = []
-                            for edge in structure:
-                                if edge[0] in ret_nodes and edge[1] in ret_nodes:
-                                    out.append(edge)
+                                for neighbor, weight in adjacency[node]:
+                                    if neighbor not in visited:
+                                        heapq.heappush(neighbors, (-weight, neighbor))
+                            # The edges between the substructure qubits, in the order of structure
+                            ret_set = set(ret_nodes)
+                            if len(ret_nodes) * (len(ret_nodes) + 1) // 2 < len(edge_index):
+                                out_index = [i for pair in itertools.combinations_with_replacement(ret_nodes, 2)
+                                             for i in edge_index.get(frozenset(pair), ())]
+                                out = [structure[i] for i in sorted(out_index)]
+                            else:
+                                out = [edge for edge in structure if edge[0] in ret_set and edge[1] in ret_set]
                             if sorted(ret_nodes) not in substructure_nodes and all(
                                     qubit[2] > fidelity_threshold for qubit in out):
                                 substructure_nodes.append(sorted(ret_nodes))
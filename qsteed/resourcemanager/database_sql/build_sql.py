@@ -15,6 +15,7 @@
 # limitations under the License.
 
 
+import ast
 import configparser
 
 import networkx as nx
@@ -43,7 +44,7 @@ def get_backend_shape():
     CONFIG = configparser.ConfigParser()
     CONFIG.read(CONFIG_FILE)
 
-    BACKENDS_SHAPE = eval(CONFIG['ChipsShape']['chips_shape'])
+    BACKENDS_SHAPE = ast.literal_eval(CONFIG['ChipsShape']['chips_shape'])
     return BACKENDS_SHAPE
 
 
@@ -186,8 +187,11 @@ def save_subqpu_data(qpu: QPU = None, reset=False):
         SubQPU.query.filter_by(qpu_name=qpu.qpu_name).delete()
         db.session.commit()
         build_lib = BuildLibrary(backend=qpu.qpu_name)
+        priority_qubits = qpu.priority_qubits
+        if isinstance(priority_qubits, str):
+            priority_qubits = ast.literal_eval(priority_qubits)
         substructure_CAL_dict = build_lib.build_substructure_library(qpu.structure, qpu.int_to_qubit,
-                                                                     eval(qpu.priority_qubits))
+                                                                     priority_qubits)
         # substructure_CAL_dict = build_lib.build_substructure_library(qpu.structure, qpu.int_to_qubit,
         #                                                              PRIORITY_REGIONS[qpu.qpu_name])
         for qubits_num, substructure_CAL_list in substructure_CAL_dict.items():
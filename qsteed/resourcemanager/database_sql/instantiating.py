@@ -41,6 +41,11 @@ def get_vqpu():
     return VQPUs
 
 
+def sort_vqpus(vqpus):
+    """Sort vqpus by the product of their coupling fidelities, highest first."""
+    return sorted(vqpus, key=lambda vqpu: vqpu.fidelity_product, reverse=True)
+
+
 def instantiating_qpu(app: Flask):
     with app.app_context():
         global QPUs
@@ -69,7 +74,7 @@ def instantiating_vqpu(app: Flask):
     with app.app_context():
         global VQPUs
         if len(VQPUs) == 0:
-            VQPUs = VQPU.query.all()
+            VQPUs = sort_vqpus(VQPU.query.all())
         return VQPUs
 
 
@@ -77,7 +82,7 @@ def update_memory_database():
     with app.app_context():
         global QPUs, StdQPUs, SubQPUs, VQPUs
         QPUs = QPU.query.all()
-        VQPUs = VQPU.query.all()
+        VQPUs = sort_vqpus(VQPU.query.all())
         StdQPUs = StdQPU.query.all()
         SubQPUs = SubQPU.query.all()
         return QPUs, StdQPUs, SubQPUs, VQPUs
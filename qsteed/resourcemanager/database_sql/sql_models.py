@@ -15,6 +15,9 @@
 # limitations under the License.
 
 
+from functools import cached_property
+
+import numpy as np
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import relationship
 from qsteed.resourcemanager.database_sql.initialize_app_db import db
@@ -135,3 +138,13 @@ class VQPU(db.Model):
 
     v2sub = relationship('SubQPU', back_populates='sub2v',
                             foreign_keys=[SubQPU.VQPU_DBid])
+
+    @cached_property
+    def q_to_vq(self):
+        """Inverse of vq_to_q (physical qubit -> virtual qubit), built once per VQPU instance."""
+        return {q: vq for vq, q in self.vq_to_q.items()}
+
+    @cached_property
+    def fidelity_product(self):
+        """Product of the fidelities of all couplings, the key VQPUs are ranked by."""
+        return float(np.prod([item[2] for item in self.coupling_list]))
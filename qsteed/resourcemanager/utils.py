@@ -26,16 +26,8 @@ def virtual_qubits(substructure):
         coupling_list (List): [[0,1,0.98],[1,0,0.99],...]
         vq_to_q (Dict): {0: 3, 1: 5,...}
     """
-    qubits_list = []
-    for coupling in substructure:
-        if coupling[0] not in qubits_list:
-            qubits_list.append(coupling[0])
-        if coupling[1] not in qubits_list:
-            qubits_list.append(coupling[1])
-    qubits_list = sorted(qubits_list)
-    vq_to_q = {q: qubits_list[q] for q in range(len(qubits_list))}
-    q_to_vq = {qubits_list[q]: q for q in range(len(qubits_list))}
-    coupling_list = []
-    for coupling in substructure:
-        coupling_list.append([q_to_vq[coupling[0]], q_to_vq[coupling[1]], coupling[2]])
+    qubits_list = sorted({q for coupling in substructure for q in coupling[:2]})
+    vq_to_q = dict(enumerate(qubits_list))
+    q_to_vq = {q: vq for vq, q in vq_to_q.items()}
+    coupling_list = [[q_to_vq[coupling[0]], q_to_vq[coupling[1]], coupling[2]] for coupling in substructure]
     return coupling_list, vq_to_q
@@ -15,7 +15,65 @@
 # limitations under the License.
 
 
-from qsteed.compiler.compiler import Compiler
+import multiprocessing
+import random
+from types import SimpleNamespace
+from unittest import mock
+
+from quafu import QuantumCircuit
+
+from qsteed.apis.compiler_api import call_compiler_api, call_compiler_api_batch
+from qsteed.compiler import compiler as compiler_module
+from qsteed.compiler.compiler import Compiler, fits_coupling
+from qsteed.compiler.qasm_parser import final_measure_mapping, parse_qasm_once
+from qsteed.passes.mapping.layout.sabre_layout import SabreLayout
+from tests.shared_utils import get_initial_model
+
+QASM_HEADER = 'OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[10];\n'
+BATCH_QASMS = [QASM_HEADER + 'creg c[2];\nh q[1];\ncx q[1],q[2];\n'
+                             'measure q[1] -> c[0];\nmeasure q[2] -> c[1];\n',
+               QASM_HEADER + 'creg c[3];\nh q[4];\ncx q[4],q[5];\ncx q[5],q[6];\n'
+                             'measure q[4] -> c[0];\nmeasure q[5] -> c[1];\nmeasure q[6] -> c[2];\n']
+
+
+def _qasm_of_depth(depth: int):
+    return QASM_HEADER + 'h q[0];\n' * depth
+
+
+# (transpiled_openqasm, swap_count) of the trial run with each seed, the best one is seed 2
+TRIAL_RESULTS = {0: (_qasm_of_depth(3), 2), 1: (_qasm_of_depth(4), 1), 2: (_qasm_of_depth(2), 1),
+                 3: (_qasm_of_depth(1), 3)}
+
+
+def _fake_transpile_trial(serialized_circuit, initial_model, optimization_level, seed):
+    random.seed(seed)
+    return TRIAL_RESULTS[seed]
+
+
+def _routed_circuit():
+    """A circuit on all the qubits of the test chip that needs routing."""
+    qc = QuantumCircuit(5)
+    qc.h(0)
+    qc.cnot(0, 2)
+    qc.cnot(1, 3)
+    qc.cnot(2, 4)
+    qc.cnot(4, 0)
+    qc.measure([0, 1, 2, 3, 4], [0, 1, 2, 3, 4])
+    return qc
+
+
+def _repeat_transpile_in_worker(repeat):
+    """Run Compiler._repeat_transpile in a pool worker, which is a daemonic process."""
+    compiler = Compiler(None, repeat=repeat)
+    random.seed(7)
+    random_state = random.getstate()
+    # A daemonic process cannot create a pool, the trials must run serially
+    initial_model = get_initial_model()
+    with mock.patch.object(compiler_module, 'create_pool', side_effect=AssertionError('create_pool called')):
+        result = compiler._repeat_transpile(_routed_circuit(), initial_model)
+    # Every trial starts from the model as given, with no layout left by the previous trial
+    model_kept = initial_model.get_layout() == {'initial_layout': None, 'final_layout': None}
+    return result, random.getstate() == random_state, model_kept
 
 
 class TestCompiler:
@@ -49,7 +107,99 @@ class TestCompiler:
         print('Measurement qubits to cbits:\n', measure_q2c)
         print('Compiled circuit information:\n', compiled_circuit_information)
 
+    def test_repeat_transpile(self):
+        """Test that repeat > 1 keeps the trial with the fewest swaps, then the smallest depth."""
+        compiler = Compiler(None, repeat=len(TRIAL_RESULTS))
+        for daemon in (False, True):
+            random.seed(2024)
+            random_state = random.getstate()
+            with mock.patch.object(compiler_module, '_transpile_trial', _fake_transpile_trial), \
+                    mock.patch.object(compiler_module.multiprocessing, 'current_process',
+                                      return_value=SimpleNamespace(daemon=daemon)):
+                result = compiler._repeat_transpile(_routed_circuit(), get_initial_model())
+            assert result == TRIAL_RESULTS[2]
+            # The seeded trials leave the random state of the caller unchanged
+            assert random.getstate() == random_state
+
+    def test_repeat_transpile_in_daemon_process(self):
+        """Test that the trials run serially in a daemonic process."""
+        with multiprocessing.Pool(1) as pool:
+            (transpiled_openqasm, swap_count), random_state_kept, model_kept = pool.apply(
+                _repeat_transpile_in_worker, (3,))
+        assert 'OPENQASM 2.0' in transpiled_openqasm
+        assert swap_count >= 0
+        assert random_state_kept
+        assert model_kept
+
+    def test_fits_coupling(self):
+        """Test that only circuits with two-qubit gates on coupled pairs fit the coupling as they are."""
+        coupling_list = [[0, 1, 0.98], [1, 2, 0.97]]
+        qc = QuantumCircuit(3)
+        qc.h(0)
+        qc.cnot(0, 1)
+        qc.cnot(1, 2)
+        qc.barrier([0, 1, 2])
+        qc.measure([0, 1, 2], [0, 1, 2])
+        assert fits_coupling(qc, coupling_list)
+
+        for gate in ('reversed', 'uncoupled', 'three-qubit'):
+            qc = QuantumCircuit(3)
+            qc.cnot(0, 1)
+            if gate == 'reversed':
+                qc.cnot(1, 0)
+            elif gate == 'uncoupled':
+                qc.cnot(0, 2)
+            else:
+                qc.toffoli(0, 1, 2)
+            assert not fits_coupling(qc, coupling_list), gate
+
+    def test_transpile_without_layout(self):
+        """Test that a circuit fitting the coupling keeps the trivial layout and gets no swap."""
+        qc = QuantumCircuit(5)
+        qc.h(0)
+        qc.cnot(0, 1)
+        qc.cnot(1, 2)
+        qc.cnot(3, 2)
+        qc.cnot(3, 4)
+        qc.measure([0, 1, 2, 3, 4], [0, 1, 2, 3, 4])
+        initial_model = get_initial_model()
+        assert fits_coupling(qc, initial_model.get_backend().get_property('coupling_list'))
+
+        with mock.patch.object(SabreLayout, 'run', side_effect=AssertionError('SabreLayout run')):
+            transpiled_openqasm, swap_count = compiler_module._transpile(qc, initial_model, 1, layout=False)
+        assert swap_count == 0
+        assert initial_model.get_layout()['initial_layout'] is None
+        parsed = parse_qasm_once(transpiled_openqasm)
+        assert [qubits for _, _, qubits in parsed.gates if len(qubits) == 2] == [[0, 1], [1, 2], [3, 2], [3, 4]]
+        assert final_measure_mapping(parsed) == {qubit: qubit for qubit in range(5)}
+
+        # With routing, the reported count is the one of the router
+        initial_model = get_initial_model()
+        transpiled_openqasm, swap_count = compiler_module._transpile(_routed_circuit(), initial_model, 1)
+        assert swap_count == initial_model.datadict['add_swap_count'] > 0
+
+    def test_call_compiler_api_batch(self):
+        """Test that call_compiler_api_batch matches call_compiler_api, in the order of the circuits."""
+        task_info = {"transpile": False, "qpu_name": 'example'}
+        compiled_infos = call_compiler_api_batch(BATCH_QASMS, num_processes=2, **task_info)
+        assert len(compiled_infos) == len(BATCH_QASMS)
+        for qasm, compiled_info in zip(BATCH_QASMS, compiled_infos):
+            expected_info = call_compiler_api(circuit=qasm, **task_info)
+            assert compiled_info[:2] == expected_info[:2]
+            compiled_info[2].pop('compile_time (s)')
+            expected_info[2].pop('compile_time (s)')
+            assert compiled_info[2] == expected_info[2]
+
+        # Repeated transpilation inside the daemonic workers of the batch
+        compiled_infos = call_compiler_api_batch(BATCH_QASMS, num_processes=2, qpu_name='example', repeat=2)
+        assert [len(compiled_info[1]) for compiled_info in compiled_infos] == [2, 3]
+
 
 if __name__ == "__main__":
     t = TestCompiler()
     t.test_compiler()
+    t.test_repeat_transpile()
+    t.test_repeat_transpile_in_daemon_process()
+    t.test_fits_coupling()
+    t.test_transpile_without_layout()
+    t.test_call_compiler_api_batch()
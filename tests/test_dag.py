@@ -14,8 +14,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import networkx as nx
+from quafu import QuantumCircuit
+
 from qsteed.dag.circuit_dag_convert import circuit_to_dag, dag_to_circuit, draw_dag, nodelist_to_dag, \
-    gate_to_node
+    gate_to_node, copy_dag
+from qsteed.dag.dagcircuit import DAGCircuit
 from tests.shared_utils import get_random_circuit
 
 
@@ -48,3 +52,102 @@ class TestDAGConversion:
         re_qc = dag_to_circuit(dag, qubits=qc.num)
         assert re_qc is not None
         assert len(qc.gates) == len(re_qc.gates), "Number of gates should be the same"
+
+    def test_copy_dag(self):
+        qc = get_random_circuit(gates_number=20)
+        dag = circuit_to_dag(qc)
+        positions = [list(node.pos) for node in dag.nodes if node not in (-1, float('inf'))]
+
+        dag_copy = copy_dag(dag)
+        re_qc = dag_to_circuit(dag_copy, qubits=qc.num)
+        assert len(qc.gates) == len(re_qc.gates), "Number of gates should be the same"
+        # Converting back must not modify the (shared) nodes
+        assert positions == [list(node.pos) for node in dag.nodes if node not in (-1, float('inf'))]
+        for node in dag_copy.nodes:
+            if node != -1:
+                assert dag_copy.node_qubits_predecessors(node) == dag.node_qubits_predecessors(node)
+
+    def test_circuit_to_dag_repeated(self):
+        qc = get_random_circuit(gates_number=20)
+        dag = circuit_to_dag(qc)
+        dag_again = circuit_to_dag(qc)
+        assert dag is not dag_again
+        assert list(dag.nodes) == list(dag_again.nodes)
+        assert list(dag.edges(keys=True, data=True)) == list(dag_again.edges(keys=True, data=True))
+
+        # Modifying one DAG must leave the other ones built from the same circuit unchanged
+        dag.remove_node(list(dag.nodes)[1])
+        assert list(circuit_to_dag(qc).nodes) == list(dag_again.nodes)
+
+    def test_circuit_to_dag_node_changes(self):
+        qc = QuantumCircuit(3)
+        qc.h(0)
+        qc.cx(0, 1)
+        qc.h(2)
+        qc.cx(1, 2)
+        qc.rz(0, 0.3)
+        qc.measure([0, 1, 2], [0, 1, 2])
+        dag = circuit_to_dag(qc)
+        nodes = list(dag.nodes)
+        edges = list(dag.edges(keys=True, data=True))
+
+        # Changing the nodes of one DAG must leave the DAGs built later from the same circuit unchanged
+        circuit_to_dag(qc).nodes_labels_resorted()
+        changed_dag = circuit_to_dag(qc)
+        for node in changed_dag.nodes_list():
+            node.label = 'changed'
+            node.pos[0] = 2
+        dag_again = circuit_to_dag(qc)
+        assert list(dag_again.nodes) == nodes
+        assert list(dag_again.edges(keys=True, data=True)) == edges
+        assert dag_again.topological_sort() == list(nx.topological_sort(dag_again))
+
+    def test_nodes_labels_resorted(self):
+        qc = get_random_circuit(gates_number=20)
+        dag = circuit_to_dag(qc)
+        dag.remove_instruction_node(dag.nodes_list()[0])
+        nodes = list(dag.nodes)
+        labels = [node.label for node in dag.nodes_list()]
+
+        new_dag = dag.nodes_labels_resorted()
+        new_labels = [node.label for node in new_dag.nodes_list() if node.name != 'measure']
+        assert new_labels == list(range(len(new_labels)))
+        assert nx.is_isomorphic(new_dag, dag)
+
+        # The nodes of the original DAG keep their labels and hashes
+        assert [node.label for node in dag.nodes_list()] == labels
+        assert all(node in dag for node in nodes)
+        assert dag.topological_sort() == list(nx.topological_sort(dag))
+
+    def test_topological_sort(self):
+        qc = get_random_circuit(gates_number=20)
+        dag = circuit_to_dag(qc)
+        assert dag.topological_sort() == list(nx.topological_sort(dag))
+
+        # The cached order follows changes of the DAG
+        dag.remove_instruction_node(dag.nodes_list()[0])
+        assert dag.topological_sort() == list(nx.topological_sort(dag))
+        assert dag.is_dag()
+
+        # An edge closing a cycle drops the cached order
+        dag.add_edge(float('inf'), -1)
+        assert not dag.is_dag()
+
+    def test_add_instruction_node_end(self):
+        qc = get_random_circuit(gates_number=20)
+        dag = circuit_to_dag(qc, measure_flag=False)
+        nodes_list = dag.nodes_list()
+
+        new_dag = DAGCircuit()
+        for node in nodes_list:
+            new_dag.add_instruction_node_end(node)
+        for node in nodes_list:
+            assert new_dag.node_qubits_predecessors(node) == dag.node_qubits_predecessors(node)
+        assert new_dag.node_qubits_predecessors(float('inf')) == dag.node_qubits_predecessors(float('inf'))
+        assert new_dag.qubits_used == dag.qubits_used
+
+        # Appending after another change of the DAG still links the node to the current last nodes
+        new_dag.remove_instruction_node(nodes_list[-1])
+        new_dag.add_instruction_node_end(nodes_list[-1])
+        for node in nodes_list:
+            assert new_dag.node_qubits_predecessors(node) == dag.node_qubits_predecessors(node)
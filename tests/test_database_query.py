@@ -14,12 +14,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import operator
 import time
-from functools import reduce
 
 from qsteed.resourcemanager.database_sql.database_query import query_subqpu, query_vqpu
-from qsteed.resourcemanager.database_sql.instantiating import get_qpu, get_subqpu, get_vqpu
+from qsteed.resourcemanager.database_sql.instantiating import get_qpu, get_subqpu, get_vqpu, sort_vqpus
 
 qpus = get_qpu()
 subqpus = get_subqpu()
@@ -51,14 +49,6 @@ class TestDatabaseQuery:
         for s in vqpu:
             print(s.coupling_list)
 
-    def _sort_vqpus(self, _vqpus, sort_attribute=None):
-        """Helper function to sort VQPUs based on a specified attribute."""
-
-        def calculate_product(vqpu):
-            return reduce(operator.mul, (item[2] for item in getattr(vqpu, sort_attribute)), 1)
-
-        return sorted(_vqpus, key=calculate_product, reverse=True)
-
     def test_sort_vqpus(self, qpu_name: str = "example", qubits_num: int = 3):
         """Test sorting VQPUs by coupling list."""
         vqpu = query_vqpu(vqpus, qpu_name=qpu_name, qubits_num=qubits_num)
@@ -66,10 +56,14 @@ class TestDatabaseQuery:
         assert vqpu is not None
 
         st = time.time()
-        sorted_vqpus = self._sort_vqpus(vqpu, sort_attribute='coupling_list')
+        sorted_vqpus = sort_vqpus(vqpu)
         elapsed_time = time.time() - st
 
         assert sorted_vqpus is not None
+        products = [s.fidelity_product for s in sorted_vqpus]
+        assert products == sorted(products, reverse=True)
+        # The VQPUs are sorted when loaded, the queries keep that order
+        assert sorted_vqpus == vqpu
         assert elapsed_time < 1  # Example assertion for performance
 
         print("Sorted vqpus with %s qubits." % qubits_num)
@@ -0,0 +1,84 @@
+# This code is part of QSteed.
+#
+# (C) Copyright 2024 Beijing Academy of Quantum Information Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from qsteed.compiler.program_verification import check_openqasm
+from qsteed.compiler.qasm_parser import final_measure_mapping, parse_qasm_once, circuit_depth, iter_statements, \
+    insert_creg, qreg_creg
+
+QASM = """
+OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[10];
+creg meas[4];
+h q[3];
+cx q[3],q[5];
+cx q[5],q[8];
+rz(0.5) q[2];
+cx q[8],q[2];
+barrier q[3],q[5],q[8],q[2];
+measure q[3] -> meas[0];
+measure q[5] -> meas[1];
+measure q[8] -> meas[2];
+measure q[2] -> meas[3];
+"""
+
+
+class TestQasmParser:
+    """Test cases for the OpenQASM 2.0 parsing helpers."""
+
+    def test_final_measure_mapping(self):
+        """Test measurement mapping extraction."""
+        assert final_measure_mapping(QASM) == {3: 0, 5: 1, 8: 2, 2: 3}
+
+    def test_parse_qasm_once(self):
+        """Test that the single-pass parse agrees with the string based helpers."""
+        parsed = parse_qasm_once(QASM)
+        assert (parsed.qreg_name, parsed.creg_name, parsed.qubit_num, parsed.cbit_num) == ('q', 'meas', 10, 4)
+        assert parsed.measures == final_measure_mapping(QASM)
+        assert parsed.depth == circuit_depth(QASM)
+        assert parsed.qubits_used == {2, 3, 5, 8}
+        assert [parsed.statement(i) for i in (0, 3)] == ['h q[3];', 'rz(0.5) q[2];']
+        assert check_openqasm(parsed, [[3, 5], [5, 8], [8, 2]], 10) == (True, 2, 3)
+        assert check_openqasm(parsed, [[3, 5, 0.99], [5, 8, 0.98], [8, 2, 0.97]], 10) == (True, 2, 3)
+        assert parse_qasm_once(QASM.encode('ascii')) == parsed
+
+    def test_check_openqasm_skipped_gates(self):
+        """Test that gates on three qubits and spaced operands are not validated, as before."""
+        qasm = QASM.replace('h q[3];', 'h q[3];\nccx q[0],q[1],q[2];\ncx q[0], q[9];')
+        assert check_openqasm(qasm, [[3, 5], [5, 8], [8, 2]], 10) == (True, 2, 3)
+
+    def test_iter_statements(self):
+        """Test statement splitting and circuit depth."""
+        statements = list(iter_statements(QASM))
+        assert statements[:3] == ['OPENQASM 2.0', 'include "qelib1.inc"', 'qreg q[10]']
+        assert statements[-1] == 'measure q[2] -> meas[3]'
+        assert len(statements) == 14
+        assert circuit_depth(QASM) == 6
+
+    def test_insert_creg(self):
+        """Test that the inserted creg is a valid declaration."""
+        qasm = 'OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[3];\nh q[0];\n'
+        inserted = insert_creg(qasm, 2)
+        assert 'qreg q[3];\ncreg c[2];\nh q[0];' in inserted
+        assert qreg_creg(inserted) == ('q', 'c', 3, 2)
+
+
+if __name__ == "__main__":
+    t = TestQasmParser()
+    t.test_final_measure_mapping()
+    t.test_parse_qasm_once()
+    t.test_iter_statements()
+    t.test_insert_creg()
@@ -55,7 +55,25 @@ class TestStandardizedCircuit:
         new_circuit.standardized_circuit()
         print(new_circuit.circuit)
 
+    def test_standardized_circuit_without_measure(self):
+        """Test that a barrier and measures are appended to a circuit without measurement."""
+        circuit = """
+        OPENQASM 2.0;
+        include "qelib1.inc";
+        qreg qq[2];
+        creg meas[0];
+        h qq[0];
+        cx qq[0],qq[1];
+        """
+        new_circuit = StandardizedCircuit(circuit)
+        new_circuit.standardized_circuit()
+        assert new_circuit.qasm_lines[-3:] == ['barrier q[0],q[1];', 'measure q[0] -> meas[0];',
+                                               'measure q[1] -> meas[1];']
+        assert 'creg meas[2];' in new_circuit.circuit
+        assert new_circuit.to_quafu().measures == {0: 0, 1: 1}
+
 
 if __name__ == "__main__":
     t = TestStandardizedCircuit()
     t.test_standardized_circuit()
+    t.test_standardized_circuit_without_measure()
@@ -16,7 +16,10 @@
 
 import time
 
-from qsteed.parallelmanager.parallel_circuits import parallel_process_circuits
+import dill
+from quafu import QuantumCircuit
+
+from qsteed.parallelmanager.parallel_circuits import _dumps, _loads, parallel_process_circuits, process_circuit
 from qsteed.transpiler.transpiler import Transpiler
 from tests.shared_utils import get_passflow, get_initial_model, get_random_circuit
 
@@ -29,8 +32,40 @@ def create_random_circuits(num_circuits, gates_number: int = 20, depth: int = No
     return circuits
 
 
+class _BrokenState:
+    calls = 0
+
+    def __getstate__(self):
+        _BrokenState.calls += 1
+        raise TypeError("broken __getstate__")
+
+
 class TestParallelTranspile:
 
+    def test_process_circuit(self):
+        """process_circuit takes and returns dill bytes."""
+        qc = QuantumCircuit(5)
+        qc.h(0)
+        for qubit in range(4):
+            qc.cnot(qubit, qubit + 1)
+        qc.measure([0, 1, 2, 3, 4], [0, 1, 2, 3, 4])
+        serialized_compiled_circuit = process_circuit(dill.dumps(qc), get_passflow(), get_initial_model())
+        assert isinstance(dill.loads(serialized_compiled_circuit), QuantumCircuit)
+
+    def test_serialization(self):
+        """Objects pickle cannot handle fall back to dill, errors raised while reducing an object are not retried."""
+        assert _dumps([1, 2])[0] is False
+        use_dill, data = _dumps(lambda x: x + 1)
+        assert use_dill
+        assert _loads((use_dill, data))(1) == 2
+        try:
+            _dumps(_BrokenState())
+        except TypeError as error:
+            assert str(error) == "broken __getstate__"
+        else:
+            raise AssertionError("The error of __getstate__ was swallowed")
+        assert _BrokenState.calls == 1
+
     def test_parallel_transpile(self):
         """Create a list of random circuits and transpile them in parallel and serial respectively."""
         num_circuits = 4